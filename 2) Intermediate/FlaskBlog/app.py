@@ -1,33 +1,940 @@
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import (Flask, render_template, request, redirect, url_for, session, jsonify, make_response,
+                   g, has_request_context, before_render_template, template_rendered)
+from markupsafe import Markup, escape
+from werkzeug.http import is_resource_modified
 import json
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 import markdown
 import hashlib
+import hmac
+import time
+import click
+import threading
+import sqlite3
+import os
+import re
+import math
+import heapq
+import tempfile
+import shutil
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from collections import namedtuple, OrderedDict, Counter
+from types import MappingProxyType
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within one process
+    fcntl = None
 
 app = Flask(__name__)
 app.secret_key = "your_secret_key_here"
 
 POSTS_FILE = Path("posts.json")
 USERS_FILE = Path("users.json")
+# "json" keeps everything in posts.json/users.json (fine for small blogs); "sqlite" uses DB_FILE.
+STORAGE_BACKEND = os.environ.get("BLOG_STORAGE", "json")
+DB_FILE = Path(os.environ.get("BLOG_DB", "blog.db"))
+SEARCH_INDEX_FILE = Path("search_index.json")
+MARKDOWN_EXTENSIONS = []
+RENDER_CACHE_SIZE = int(os.environ.get("BLOG_RENDER_CACHE_SIZE", "2048"))
+PREVIEW_CHARS = 300
+PUBLIC_MAX_AGE = int(os.environ.get("BLOG_PUBLIC_MAX_AGE", "60"))
+PAGE_SIZE = 10
+MAX_PAGE_SIZE = 100
+EXPORT_DIR = "site"
+EXPORT_MANIFEST = ".export.json"
+SEARCH_RESULTS = 20
+# Matches ranked per query, newest first; terms rarer than this are ranked exactly.
+SEARCH_MAX_CANDIDATES = int(os.environ.get("BLOG_SEARCH_MAX_CANDIDATES", "2000"))
+SEARCH_LOG_MAX = 1000  # logged index writes before the JSON index file is rewritten
+SNIPPET_CHARS = 160
+TITLE_WEIGHT = 2  # a title match counts as much as this many body matches
+# Password work factor. Raising it makes every login slower; stored hashes made with
+# other settings are upgraded on the user's next successful login.
+PASSWORD_SCHEME = os.environ.get("BLOG_PASSWORD_SCHEME", "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256")
+SCRYPT_N = int(os.environ.get("BLOG_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.environ.get("BLOG_SCRYPT_R", "8"))
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = int(os.environ.get("BLOG_PBKDF2_ITERATIONS", "600000"))
+# Logins hashing at once per worker; extra logins queue instead of fighting for CPU and memory.
+LOGIN_CONCURRENCY = int(os.environ.get("BLOG_LOGIN_CONCURRENCY", str(os.cpu_count() or 1)))
+# Comma-separated usernames allowed to see /metrics and /stats/render-cache.
+ADMIN_USERS = {name.strip() for name in os.environ.get("BLOG_ADMINS", "admin").split(",") if name.strip()}
 
 # ----------------- Load/Save -----------------
+def read_json(path, default):
+    # Missing and empty files both mean "no data yet".
+    if path.exists():
+        text = path.read_text()
+        if text.strip():
+            return json.loads(text)
+    return default
+
 def load_posts():
-    if POSTS_FILE.exists():
-        return json.loads(POSTS_FILE.read_text())
-    return []
+    return read_json(POSTS_FILE, [])
+
+def atomic_write(path, text, before_replace=None):
+    # Write a temp file in the same directory, fsync it and rename it over `path`, so
+    # readers see either the old or the new contents, never a truncated file.
+    # `before_replace` is called with the temp file's path just before the rename.
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if before_replace is not None:
+            before_replace(Path(tmp))
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+    if hasattr(os, "O_DIRECTORY"):  # make the rename itself durable
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
-def save_posts(posts):
-    POSTS_FILE.write_text(json.dumps(posts, indent=2))
+@contextmanager
+def file_lock(path):
+    # Exclusive advisory lock shared by all worker processes. Only writers take it.
+    with open(path, "a") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def save_posts(posts, before_replace=None):
+    atomic_write(POSTS_FILE, json.dumps(posts, indent=2), before_replace)
 
 def load_users():
-    if USERS_FILE.exists():
-        return json.loads(USERS_FILE.read_text())
-    admin = {"admin": hashlib.sha256("admin".encode()).hexdigest()}
-    USERS_FILE.write_text(json.dumps(admin, indent=2))
+    users = read_json(USERS_FILE, None)
+    if users is not None:
+        return users
+    admin = {"admin": hash_password("admin")}
+    atomic_write(USERS_FILE, json.dumps(admin, indent=2))
     return admin
 
-users = load_users()
+def file_signature(path):
+    # Changes whenever the file is replaced or rewritten; None if it doesn't exist.
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+# ----------------- Passwords -----------------
+# Hashes are stored as "scrypt$n$r$p$salt$digest" or "pbkdf2_sha256$iterations$salt$digest".
+# Entries from older versions are bare unsalted sha256 hex digests.
+hash_slots = threading.BoundedSemaphore(LOGIN_CONCURRENCY)
+
+def password_params():
+    return (SCRYPT_N, SCRYPT_R, SCRYPT_P) if PASSWORD_SCHEME == "scrypt" else (PBKDF2_ITERATIONS,)
+
+def derive_key(scheme, params, salt, password):
+    with hash_slots:
+        if scheme == "scrypt":
+            n, r, p = params
+            return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                                  maxmem=256 * n * r * p, dklen=32)
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, params[0])
+
+def hash_password(password):
+    salt = os.urandom(16)
+    params = password_params()
+    digest = derive_key(PASSWORD_SCHEME, params, salt, password)
+    return "$".join([PASSWORD_SCHEME, *map(str, params), salt.hex(), digest.hex()])
+
+def check_password(stored, password):
+    # Returns (matches, needs_rehash). Unknown users pay for a full hash too, so every
+    # login costs the same and response times don't reveal which usernames exist.
+    if stored is None:
+        hash_password(password)
+        return False, False
+    if "$" not in stored:
+        ok = hmac.compare_digest(stored, hashlib.sha256(password.encode()).hexdigest())
+        return ok, ok
+    scheme, *params, salt, digest = stored.split("$")
+    params = tuple(int(v) for v in params)
+    ok = hmac.compare_digest(derive_key(scheme, params, bytes.fromhex(salt), password).hex(), digest)
+    return ok, ok and (scheme, params) != (PASSWORD_SCHEME, password_params())
+
+class JsonUserStore:
+    # users.json, re-read whenever the file is replaced, so users added or changed by
+    # another worker or by hand work without a restart.
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self.lock = threading.Lock()
+        self.signature = None
+        self.users = {}
+
+    def get(self, username):
+        if self.signature is None or file_signature(self.path) != self.signature:
+            with self.lock:
+                self.users = load_users()
+                self.signature = file_signature(self.path)
+        return self.users.get(username)
+
+    def set(self, username, password_hash):
+        with self.lock, file_lock(self.lock_path):
+            users = dict(load_users(), **{username: password_hash})
+            atomic_write(self.path, json.dumps(users, indent=2))
+            self.users = users
+            self.signature = file_signature(self.path)
+
+# ----------------- Search -----------------
+# Both backends mark matches with these control characters; the text is HTML-escaped
+# first and the markers become <mark> tags afterwards, so post content can't inject HTML.
+MARK_START, MARK_END = "\x02", "\x03"
+
+def tokenize(text):
+    return re.findall(r"\w+", text.lower())
+
+def query_terms(query):
+    return list(dict.fromkeys(tokenize(query)))
+
+def to_html(marked):
+    return Markup(str(escape(marked)).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>"))
+
+def term_pattern(terms):
+    return re.compile(r"\b(" + "|".join(map(re.escape, terms)) + r")\b", re.IGNORECASE)
+
+def mark_terms(text, pattern):
+    return pattern.sub(lambda m: MARK_START + m.group(0) + MARK_END, text)
+
+def make_snippet(text, pattern):
+    # A SNIPPET_CHARS window starting a little before the first match, cut at spaces.
+    match = pattern.search(text)
+    start = max(match.start() - SNIPPET_CHARS // 3, 0) if match else 0
+    if start:
+        start = text.find(" ", start, match.start()) + 1 or start
+    end = min(start + SNIPPET_CHARS, len(text))
+    if end < len(text):
+        end = max(text.rfind(" ", start, end), start + SNIPPET_CHARS // 2)
+    window = ("..." if start else "") + text[start:end] + ("..." if end < len(text) else "")
+    return mark_terms(window, pattern)
+
+class SearchIndex:
+    # Inverted index for the JSON store: term -> {post id: weighted term frequency}, ranked
+    # with BM25. It is updated one post at a time on every write. Each write appends its
+    # changes to a log beside the index file, chained by posts file signature, before the
+    # new posts.json is renamed into place; the index file itself is only rewritten once
+    # the log grows long, so a write costs O(post), and a restart or another worker
+    # replays the log instead of rebuilding. Only writers (under the posts lock) touch
+    # either file; a reader that has to rebuild keeps the result in memory.
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, path):
+        self.path = path
+        self.log_path = path.with_name(path.name + ".log")
+        self.signature = None
+        self.postings = {}  # term -> {post id: tf}, oldest write first
+        self.lengths = {}   # post id -> sum of its tfs
+        self.total = 0
+        self.changes = []   # ("add", id, counts) / ("remove", id, terms) since the last commit
+        self.saved = False  # whether the index file plus log hold this state
+        self.logged = 0     # entries in the log file
+
+    @staticmethod
+    def counts(post):
+        counts = Counter(tokenize(post["content"]))
+        for term in tokenize(post["title"]):
+            counts[term] += TITLE_WEIGHT
+        return counts
+
+    def add(self, post):
+        counts = self.counts(post)
+        self._add(post["id"], counts)
+        self.changes.append(("add", post["id"], counts))
+
+    def remove(self, post):
+        # Takes the post as it was indexed; its terms say which postings to touch.
+        if post is None or post["id"] not in self.lengths:
+            return
+        terms = list(self.counts(post))
+        self._remove(post["id"], terms)
+        self.changes.append(("remove", post["id"], terms))
+
+    def _add(self, post_id, counts):
+        postings = self.postings
+        for term, tf in counts.items():
+            posting = postings.get(term)
+            if posting is None:
+                postings[term] = {post_id: tf}
+            else:
+                posting[post_id] = tf
+        self.lengths[post_id] = length = sum(counts.values())
+        self.total += length
+
+    def _remove(self, post_id, terms):
+        if post_id not in self.lengths:
+            return
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(post_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total -= self.lengths.pop(post_id)
+
+    def sync(self, posts, signature):
+        # Make the index match posts.json: replay the log onto what we have, else onto the
+        # saved index, else rebuild.
+        if signature == self.signature:
+            return
+        if self.signature is not None and self._replay(signature):
+            return
+        saved = read_json(self.path, {})
+        if saved:
+            self.postings = {term: dict(zip(ids, tfs)) for term, (ids, tfs) in saved["postings"].items()}
+            self.lengths = dict(zip(saved["ids"], saved["lengths"]))
+            self.total = sum(self.lengths.values())
+            self.signature = tuple(saved["signature"]) or None
+            self.saved = True
+            if self._replay(signature):
+                return
+        # The next commit() saves the rebuilt index.
+        self.postings, self.lengths, self.total = {}, {}, 0
+        for post in posts:
+            self._add(post["id"], self.counts(post))
+        self.signature = signature
+        self.saved = False
+
+    def _replay(self, signature):
+        # Apply the logged writes that follow on from self.signature, up to `signature`.
+        try:
+            lines = self.log_path.read_text(encoding="utf-8").splitlines()
+        except FileNotFoundError:
+            lines = []
+        self.logged = len(lines)
+        target = list(signature or [])
+        current = list(self.signature or [])
+        for line in lines:
+            if current == target:
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:  # a writer is still appending it
+                break
+            if entry["prev"] != current:
+                continue
+            for op, post_id, data in entry["changes"]:
+                if op == "add":
+                    self._add(post_id, data)
+                else:
+                    self._remove(post_id, data)
+            current = entry["signature"]
+        self.signature = tuple(current) or None
+        return current == target
+
+    def commit(self, signature):
+        # Called by a writer holding the posts lock, with the signature the new posts file
+        # will have, before it replaces the old one.
+        prev, self.signature = self.signature, signature
+        changes, self.changes = self.changes, []
+        if not self.saved or self.logged >= SEARCH_LOG_MAX or not self.path.exists():
+            self.save()
+            return
+        entry = {"prev": list(prev or []), "signature": list(signature or []), "changes": changes}
+        with open(self.log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.logged += 1
+
+    def save(self):
+        # Column lists instead of {id: tf} objects: smaller, and int keys survive the round trip.
+        atomic_write(self.path, json.dumps({
+            "signature": list(self.signature or []),
+            "ids": list(self.lengths),
+            "lengths": list(self.lengths.values()),
+            "postings": {term: (list(p), list(p.values())) for term, p in self.postings.items()},
+        }))
+        self.log_path.unlink(missing_ok=True)
+        self.logged = 0
+        self.changes = []
+        self.saved = True
+
+    def search(self, terms, limit):
+        # AND of all terms. Walk the rarest posting list newest write first and rank at most
+        # SEARCH_MAX_CANDIDATES matches, so a term in every post costs O(cap), not O(posts).
+        postings = [self.postings.get(term) for term in terms]
+        if not terms or not all(postings):
+            return []
+        postings.sort(key=len)
+        rarest, others = postings[0], postings[1:]
+        candidates = islice((post_id for post_id in reversed(rarest) if all(post_id in p for p in others)),
+                            SEARCH_MAX_CANDIDATES)
+        n = len(self.lengths)
+        avgdl = self.total / n
+        idf = [math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+
+        def score(post_id):
+            norm = self.K1 * (1 - self.B + self.B * self.lengths[post_id] / avgdl)
+            return sum(w * p[post_id] * (self.K1 + 1) / (p[post_id] + norm) for w, p in zip(idf, postings))
+
+        return heapq.nlargest(limit, ((score(post_id), post_id) for post_id in candidates))
+
+def search_result(post, title, snippet):
+    return {"id": post["id"], "date": post["date"], "title": to_html(title), "snippet": to_html(snippet)}
+
+# ----------------- Metrics -----------------
+# Per-endpoint latency histograms, plus how much of each request went to the post store
+# (load_posts or SQLite queries), markdown rendering and template rendering. Numbers are
+# per worker process.
+class LatencyHistogram:
+    # Log-spaced buckets, each 10% wider than the last: O(1) memory and recording, with
+    # percentiles accurate to within one bucket.
+    FLOOR = 0.00001
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.buckets = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        self.buckets[int(math.log(max(seconds, self.FLOOR) / self.FLOOR, self.GROWTH))] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        rank = fraction * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.FLOOR * self.GROWTH ** (bucket + 1), self.max)
+        return self.max
+
+    def summary(self):
+        def ms(seconds):
+            return round(seconds * 1000, 3)
+
+        return {"count": self.count, "mean_ms": ms(self.total / self.count) if self.count else 0.0,
+                "p50_ms": ms(self.percentile(0.50)), "p95_ms": ms(self.percentile(0.95)),
+                "p99_ms": ms(self.percentile(0.99)), "max_ms": ms(self.max)}
+
+class Metrics:
+    PHASES = ("store", "markdown", "template")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, seconds, phases):
+        with self.lock:
+            hists = self.endpoints.get(endpoint)
+            if hists is None:
+                hists = self.endpoints[endpoint] = {name: LatencyHistogram() for name in ("total",) + self.PHASES}
+            hists["total"].record(seconds)
+            for name in self.PHASES:
+                hists[name].record(phases.get(name, 0.0))
+
+    def snapshot(self):
+        with self.lock:
+            return {endpoint: {name: hist.summary() for name, hist in hists.items()}
+                    for endpoint, hists in self.endpoints.items()}
+
+metrics = Metrics()
+
+@contextmanager
+def timed(phase):
+    # Adds the block's duration to the current request's phase total; a no-op outside
+    # requests (CLI commands, export workers).
+    if not has_request_context() or "timings" not in g:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.timings[phase] = g.timings.get(phase, 0.0) + time.perf_counter() - start
+
+class TimedStore:
+    # Wraps a post store so every call counts towards the request's "store" time.
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __getattr__(self, name):
+        attr = getattr(self.inner, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            with timed("store"):
+                return attr(*args, **kwargs)
+        return call
+
+@app.before_request
+def start_timer():
+    g.timings = {}
+    g.started = time.perf_counter()
+
+@app.after_request
+def record_timing(response):
+    if "started" in g:
+        metrics.record(request.endpoint or str(response.status_code), time.perf_counter() - g.started, g.timings)
+    return response
+
+@before_render_template.connect_via(app)
+def start_template_timer(sender, template, context, **extra):
+    g.template_started = time.perf_counter()
+
+@template_rendered.connect_via(app)
+def stop_template_timer(sender, template, context, **extra):
+    if "template_started" in g and "timings" in g:
+        g.timings["template"] = g.timings.get("template", 0.0) + time.perf_counter() - g.pop("template_started")
+
+# ----------------- Post Stores -----------------
+# Both stores expose the same methods: get(id), newest(), page(), search(), add(), update(),
+# delete(), password_hash(username) and set_password_hash(username, hash). Posts are returned as read-only mappings.
+# Immutable view of the posts: `posts` in file order, `oldest` sorted by (date, id) with
+# the matching `keys` for bisecting, `newest` the reverse, and `by_id` for O(1) lookups.
+# Each post is a read-only mapping.
+PostSnapshot = namedtuple("PostSnapshot", ["posts", "oldest", "keys", "newest", "by_id"])
+
+# One page of the index, newest first, plus keyset cursors for the neighbouring pages.
+Page = namedtuple("Page", ["posts", "newer", "older"])
+
+def sort_key(post):
+    return (post["date"], post["id"])
+
+def make_snapshot(posts):
+    frozen = tuple(MappingProxyType(dict(p)) for p in posts)
+    oldest = tuple(sorted(frozen, key=sort_key))
+    keys = [sort_key(p) for p in oldest]
+    return PostSnapshot(frozen, oldest, keys, oldest[::-1], MappingProxyType({p["id"]: p for p in frozen}))
+
+def format_cursor(post):
+    return f"{post['date']},{post['id']}"
+
+def parse_cursor(value):
+    # "date,id" -> (date, id); None when absent or malformed.
+    if not value:
+        return None
+    date, _, post_id = value.rpartition(",")
+    if not date or not post_id.isdigit():
+        return None
+    return (date, int(post_id))
+
+class JsonPostStore:
+    # Keeps posts.json in memory and re-reads it only when it is replaced, e.g. after an
+    # edit by another worker. Requests get a whole snapshot, never a list that is being
+    # modified; writers build a new snapshot and swap it in.
+    # Writers across worker processes are serialized by `lock` plus a lock file and re-read
+    # the posts under them, so no update is lost. Readers never take either: a reader that
+    # sees a replaced posts.json rebuilds its snapshot under `refresh_lock`, which is only
+    # held while re-reading, never across a file lock wait or a write. Ids come from a
+    # sequence file, so a deleted post's id is never handed out again.
+    def __init__(self, path):
+        self.path = path
+        self.lock_path = path.with_name(path.name + ".lock")
+        self.seq_path = path.with_name(path.name + ".seq")
+        self.lock = threading.Lock()
+        self.refresh_lock = threading.Lock()
+        self.index_lock = threading.Lock()
+        self.signature = None
+        self.current = make_snapshot([])
+        self.index = SearchIndex(SEARCH_INDEX_FILE)
+        self.users = JsonUserStore(USERS_FILE)
+
+    def _stat(self):
+        return file_signature(self.path)
+
+    def _refresh(self):
+        with self.refresh_lock:
+            signature = self._stat()
+            if signature != self.signature:
+                snap = make_snapshot(load_posts())
+                with self.index_lock:
+                    self.index.sync(snap.posts, signature)
+                self.current, self.signature = snap, signature
+            return self.current
+
+    @contextmanager
+    def _writing(self):
+        # Yields the current posts as plain dicts, with this process's and every other
+        # worker's writers locked out.
+        with self.lock, file_lock(self.lock_path):
+            yield [dict(p) for p in self._refresh().posts]
+
+    def _next_id(self, posts):
+        # Caller is inside _writing().
+        last = int(read_json(self.seq_path, 0))
+        post_id = max([last] + [p["id"] for p in posts]) + 1
+        atomic_write(self.seq_path, str(post_id))
+        return post_id
+
+    def snapshot(self):
+        if self._stat() == self.signature:
+            return self.current
+        return self._refresh()
+
+    def get(self, post_id):
+        return self.snapshot().by_id.get(post_id)
+
+    def version(self):
+        # (token that changes on every write, last-modified time) for HTTP validators.
+        self.snapshot()
+        if self.signature is None:
+            return "empty", None
+        mtime_ns, size, _ = self.signature
+        return f"{mtime_ns}-{size}", datetime.fromtimestamp(mtime_ns / 1e9, timezone.utc)
+
+    def newest(self):
+        return self.snapshot().newest
+
+    def page(self, before=None, after=None, limit=PAGE_SIZE):
+        # Bisect into the presorted keys: O(log n + limit) per page.
+        snap = self.snapshot()
+        if after is not None:
+            start = bisect_right(snap.keys, after)
+            end = min(start + limit, len(snap.keys))
+        else:
+            end = bisect_left(snap.keys, before) if before is not None else len(snap.keys)
+            start = max(end - limit, 0)
+        posts = snap.oldest[start:end][::-1]
+        newer = format_cursor(posts[0]) if posts and end < len(snap.keys) else None
+        older = format_cursor(posts[-1]) if posts and start > 0 else None
+        return Page(posts, newer, older)
+
+    def search(self, query, limit=SEARCH_RESULTS):
+        terms = query_terms(query)
+        snap = self.snapshot()
+        # The index is mutated in place by writers; index_lock only covers the mutation
+        # itself, not their file writes.
+        with self.index_lock:
+            hits = self.index.search(terms, limit)
+        pattern = term_pattern(terms)
+        posts = (snap.by_id.get(post_id) for _, post_id in hits)
+        return [search_result(post, mark_terms(post["title"], pattern), make_snippet(post["content"], pattern))
+                for post in posts if post is not None]
+
+    def password_hash(self, username):
+        return self.users.get(username)
+
+    def set_password_hash(self, username, password_hash):
+        self.users.set(username, password_hash)
+
+    def _write(self, posts):
+        # Caller is inside _writing() and has already applied the change to self.index.
+        # The rename keeps the temp file's mtime and inode, so its signature is the one
+        # readers will see; logging the index change first means they can always replay it.
+        def commit_index(tmp):
+            self.index.commit(file_signature(tmp))
+
+        save_posts(posts, commit_index)
+        snap = make_snapshot(posts)
+        with self.refresh_lock:
+            self.current, self.signature = snap, self._stat()
+
+    def add(self, title, content):
+        with self._writing() as posts:
+            post_item = {
+                "id": self._next_id(posts),
+                "title": title,
+                "content": content,
+                "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            }
+            posts.append(post_item)
+            with self.index_lock:
+                self.index.add(post_item)
+            self._write(posts)
+            return post_item
+
+    def update(self, post_id, title, content):
+        with self._writing() as posts:
+            for p in posts:
+                if p["id"] == post_id:
+                    with self.index_lock:
+                        self.index.remove(p)
+                        p["title"] = title
+                        p["content"] = content
+                        self.index.add(p)
+                    self._write(posts)
+                    return p
+            return None
+
+    def delete(self, post_id):
+        with self._writing() as posts:
+            removed = [p for p in posts if p["id"] == post_id]
+            if not removed:
+                return
+            with self.index_lock:
+                self.index.remove(removed[0])
+            self._write([p for p in posts if p["id"] != post_id])
+
+class SqlitePostStore:
+    # Posts and users in SQLite (WAL mode, so readers never wait for a writer). Each thread
+    # gets its own connection. A new database imports posts.json/users.json once.
+    # Search uses an FTS5 table over the posts table, kept current by triggers; like the
+    # JSON index it ranks only the newest SEARCH_MAX_CANDIDATES matches.
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        conn = self._conn()
+        fts_exists = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'posts_fts'").fetchone()
+        with conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS posts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    content TEXT NOT NULL,
+                    date TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS posts_date ON posts (date, id);
+                CREATE TABLE IF NOT EXISTS users (username TEXT PRIMARY KEY, password TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+                INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+                INSERT OR IGNORE INTO meta (key, value) VALUES ('updated', strftime('%s', 'now'));
+            """)
+            # Every write to posts bumps the version used for ETags, including the JSON import.
+            for event in ("INSERT", "UPDATE", "DELETE"):
+                conn.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS posts_version_{event.lower()} AFTER {event} ON posts
+                    BEGIN
+                        UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version';
+                        UPDATE meta SET value = strftime('%s', 'now') WHERE key = 'updated';
+                    END
+                """)
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+                    title, content, content='posts', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+                    INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+                    INSERT INTO posts_fts (posts_fts, rowid, title, content)
+                    VALUES ('delete', old.id, old.title, old.content);
+                END;
+                CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE ON posts BEGIN
+                    INSERT INTO posts_fts (posts_fts, rowid, title, content)
+                    VALUES ('delete', old.id, old.title, old.content);
+                    INSERT INTO posts_fts (rowid, title, content) VALUES (new.id, new.title, new.content);
+                END;
+            """)
+            if not fts_exists:
+                conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+        if not conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+            self.import_json()
+
+    def _conn(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def import_json(self, posts_file=POSTS_FILE, users_file=USERS_FILE):
+        posts = read_json(posts_file, [])
+        user_rows = read_json(users_file, None) or load_users()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO posts (id, title, content, date) VALUES (:id, :title, :content, :date)", posts
+            )
+            conn.executemany("INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)", user_rows.items())
+            # REPLACE skips the delete triggers, so resync the search index in one pass.
+            conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_imported', ?)",
+                         (datetime.now().isoformat(),))
+        return len(posts), len(user_rows)
+
+    def get(self, post_id):
+        row = self._conn().execute("SELECT * FROM posts WHERE id = ?", (post_id,)).fetchone()
+        return MappingProxyType(dict(row)) if row else None
+
+    def version(self):
+        meta = dict(self._conn().execute("SELECT key, value FROM meta WHERE key IN ('version', 'updated')"))
+        return meta["version"], datetime.fromtimestamp(int(meta["updated"]), timezone.utc)
+
+    def newest(self):
+        rows = self._conn().execute("SELECT * FROM posts ORDER BY date DESC, id DESC")
+        return tuple(MappingProxyType(dict(row)) for row in rows)
+
+    def _exists(self, where, params):
+        return self._conn().execute(f"SELECT 1 FROM posts WHERE {where} LIMIT 1", params).fetchone() is not None
+
+    def page(self, before=None, after=None, limit=PAGE_SIZE):
+        # Keyset queries served by the (date, id) index: O(limit) rows per page.
+        older_than = "date < ? OR (date = ? AND id < ?)"
+        newer_than = "date > ? OR (date = ? AND id > ?)"
+        conn = self._conn()
+        if after is not None:
+            rows = conn.execute(f"SELECT * FROM posts WHERE {newer_than} ORDER BY date, id LIMIT ?",
+                                (after[0], after[0], after[1], limit)).fetchall()[::-1]
+        elif before is not None:
+            rows = conn.execute(f"SELECT * FROM posts WHERE {older_than} ORDER BY date DESC, id DESC LIMIT ?",
+                                (before[0], before[0], before[1], limit)).fetchall()
+        else:
+            rows = conn.execute("SELECT * FROM posts ORDER BY date DESC, id DESC LIMIT ?", (limit,)).fetchall()
+        posts = tuple(MappingProxyType(dict(row)) for row in rows)
+        if not posts:
+            return Page(posts, None, None)
+        first, last = sort_key(posts[0]), sort_key(posts[-1])
+        newer = format_cursor(posts[0]) if self._exists(newer_than, (first[0], first[0], first[1])) else None
+        older = format_cursor(posts[-1]) if self._exists(older_than, (last[0], last[0], last[1])) else None
+        return Page(posts, newer, older)
+
+    def search(self, query, limit=SEARCH_RESULTS):
+        terms = query_terms(query)
+        if not terms:
+            return []
+        rows = self._conn().execute(f"""
+            SELECT posts.id, posts.date,
+                   highlight(posts_fts, 0, :start, :end) AS title,
+                   snippet(posts_fts, 1, :start, :end, '...', 24) AS snippet
+            FROM posts_fts JOIN posts ON posts.id = posts_fts.rowid
+            WHERE posts_fts MATCH :match AND posts_fts.rowid >= coalesce((
+                SELECT rowid FROM posts_fts WHERE posts_fts MATCH :match
+                ORDER BY rowid DESC LIMIT 1 OFFSET :cap - 1), 0)
+            ORDER BY bm25(posts_fts, {TITLE_WEIGHT}, 1.0) LIMIT :limit
+        """, {"start": MARK_START, "end": MARK_END, "limit": limit, "cap": SEARCH_MAX_CANDIDATES,
+              "match": " ".join(f'"{term}"' for term in terms)})
+        return [search_result(row, row["title"], row["snippet"]) for row in rows]
+
+    def add(self, title, content):
+        date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        conn = self._conn()
+        with conn:
+            cur = conn.execute("INSERT INTO posts (title, content, date) VALUES (?, ?, ?)", (title, content, date))
+        return {"id": cur.lastrowid, "title": title, "content": content, "date": date}
+
+    def update(self, post_id, title, content):
+        conn = self._conn()
+        with conn:
+            conn.execute("UPDATE posts SET title = ?, content = ? WHERE id = ?", (title, content, post_id))
+        return self.get(post_id)
+
+    def delete(self, post_id):
+        conn = self._conn()
+        with conn:
+            conn.execute("DELETE FROM posts WHERE id = ?", (post_id,))
+
+    def password_hash(self, username):
+        row = self._conn().execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
+        return row["password"] if row else None
+
+    def set_password_hash(self, username, password_hash):
+        conn = self._conn()
+        with conn:
+            conn.execute("INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)", (username, password_hash))
+
+def create_store():
+    if STORAGE_BACKEND == "sqlite":
+        return SqlitePostStore(DB_FILE)
+    return JsonPostStore(POSTS_FILE)
+
+store = TimedStore(create_store())
+
+# ----------------- Markdown Render Cache -----------------
+class RenderCache:
+    # LRU of rendered HTML keyed by sha256(markdown config + source text), so an edit
+    # naturally misses and a changed extension list never serves stale HTML.
+    def __init__(self, maxsize=RENDER_CACHE_SIZE, extensions=MARKDOWN_EXTENSIONS):
+        self.maxsize = maxsize
+        self.extensions = list(extensions)
+        self.config_key = json.dumps(self.extensions)
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text):
+        return hashlib.sha256(f"{self.config_key}\0{text}".encode()).hexdigest()
+
+    def render(self, text):
+        key = self.key(text)
+        with self.lock:
+            html = self.entries.get(key)
+            if html is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+        with timed("markdown"):
+            html = markdown.markdown(text, extensions=self.extensions)
+        with self.lock:
+            self.entries[key] = html
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return html
+
+    def discard(self, text):
+        with self.lock:
+            self.entries.pop(self.key(text), None)
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {"size": len(self.entries), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+render_cache = RenderCache()
+
+def preview_source(content):
+    return content[:PREVIEW_CHARS] + "..."
+
+def forget_rendered(post_item):
+    # Drop the old full and preview renders of a post that is being edited or deleted.
+    if post_item:
+        render_cache.discard(post_item["content"])
+        render_cache.discard(preview_source(post_item["content"]))
+
+# ----------------- HTTP Caching -----------------
+def build_id():
+    # Changes when the code or templates change, so a deploy never revalidates old HTML.
+    paths = [Path(__file__)] + sorted(Path(app.root_path, "templates").glob("*.html"))
+    return str(max(int(p.stat().st_mtime) for p in paths if p.exists()))
+
+BUILD_ID = build_id()
+BUILD_TIME = datetime.fromtimestamp(int(BUILD_ID), timezone.utc)
+
+def conditional_view(etag_source, last_modified, render):
+    # Answers 304 straight from the validators, before any markdown or template work.
+    # Anonymous pages may be stored by shared caches; logged-in pages must be revalidated
+    # by the browser and are never stored by proxies.
+    user = session.get("username")
+    etag = hashlib.sha1(json.dumps([BUILD_ID, user, etag_source]).encode()).hexdigest()
+    if user:
+        # Last-Modified is store-wide and can't tell who a cached copy was rendered for, so
+        # logged-in pages are validated by ETag alone and never send it.
+        last_modified = None
+    elif last_modified is not None:
+        last_modified = max(last_modified, BUILD_TIME)
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response = make_response(render())
+    else:
+        response = app.response_class(status=304)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    if user:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    else:
+        response.cache_control.public = True
+        response.cache_control.max_age = PUBLIC_MAX_AGE
+    response.vary.add("Cookie")
+    return response
 
 # ----------------- Authentication -----------------
 def login_required(f):
@@ -39,13 +946,26 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated
 
+def admin_required(f):
+    from functools import wraps
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if "username" not in session:
+            return redirect(url_for("login"))
+        if session["username"] not in ADMIN_USERS:
+            return "Forbidden", 403
+        return f(*args, **kwargs)
+    return decorated
+
 @app.route("/login", methods=["GET","POST"])
 def login():
     if request.method == "POST":
         username = request.form.get("username")
-        password = request.form.get("password")
-        hashed = hashlib.sha256(password.encode()).hexdigest()
-        if username in users and users[username] == hashed:
+        password = request.form.get("password", "")
+        ok, needs_rehash = check_password(store.password_hash(username), password)
+        if ok:
+            if needs_rehash:
+                store.set_password_hash(username, hash_password(password))
             session["username"] = username
             return redirect(url_for("index"))
         return "Invalid credentials", 401
@@ -59,20 +979,45 @@ def logout():
 # ----------------- Routes -----------------
 @app.route("/")
 def index():
-    posts = load_posts()
-    posts.sort(key=lambda x: x["date"], reverse=True)
-    for post in posts:
-        post["content_html"] = markdown.markdown(post["content"][:300] + "...")
-    return render_template("index.html", posts=posts, user=session.get("username"))
+    limit = min(max(request.args.get("limit", PAGE_SIZE, type=int), 1), MAX_PAGE_SIZE)
+    before = parse_cursor(request.args.get("before"))
+    after = parse_cursor(request.args.get("after"))
+    version, last_modified = store.version()
+
+    def render():
+        page = store.page(before=before, after=after, limit=limit)
+        posts = [dict(post, content_html=render_cache.render(preview_source(post["content"])))
+                 for post in page.posts]
+        return render_template(
+            "index.html", posts=posts, user=session.get("username"),
+            newer_url=url_for("index", after=page.newer, limit=limit) if page.newer else None,
+            older_url=url_for("index", before=page.older, limit=limit) if page.older else None)
+
+    return conditional_view(["index", version, before, after, limit], last_modified, render)
 
 @app.route("/post/<int:post_id>")
 def post(post_id):
-    posts = load_posts()
-    post_item = next((p for p in posts if p["id"] == post_id), None)
+    post_item = store.get(post_id)
     if not post_item:
         return "Post not found", 404
-    post_item["content_html"] = markdown.markdown(post_item["content"])
-    return render_template("post.html", post=post_item, user=session.get("username"))
+    _, last_modified = store.version()
+
+    def render():
+        rendered = dict(post_item, content_html=render_cache.render(post_item["content"]))
+        return render_template("post.html", post=rendered, user=session.get("username"))
+
+    return conditional_view(["post", dict(post_item)], last_modified, render)
+
+@app.route("/search")
+def search():
+    query = request.args.get("q", "").strip()
+    version, last_modified = store.version()
+
+    def render():
+        results = store.search(query) if query else []
+        return render_template("search.html", query=query, results=results, user=session.get("username"))
+
+    return conditional_view(["search", version, query], last_modified, render)
 
 @app.route("/new", methods=["GET", "POST"])
 @login_required
@@ -80,41 +1025,151 @@ def new_post():
     if request.method == "POST":
         title = request.form.get("title")
         content = request.form.get("content")
-        posts = load_posts()
-        new_id = max([p["id"] for p in posts], default=0) + 1
-        post_item = {
-            "id": new_id,
-            "title": title,
-            "content": content,
-            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        posts.append(post_item)
-        save_posts(posts)
+        store.add(title, content)
         return redirect(url_for("index"))
     return render_template("new_post.html", post=None)
 
 @app.route("/edit/<int:post_id>", methods=["GET", "POST"])
 @login_required
 def edit_post(post_id):
-    posts = load_posts()
-    post_item = next((p for p in posts if p["id"] == post_id), None)
+    post_item = store.get(post_id)
     if not post_item:
         return "Post not found", 404
     if request.method == "POST":
-        post_item["title"] = request.form.get("title")
-        post_item["content"] = request.form.get("content")
-        save_posts(posts)
+        forget_rendered(post_item)
+        store.update(post_id, request.form.get("title"), request.form.get("content"))
         return redirect(url_for("post", post_id=post_id))
     return render_template("new_post.html", post=post_item)
 
 @app.route("/delete/<int:post_id>")
 @login_required
 def delete_post(post_id):
-    posts = load_posts()
-    posts = [p for p in posts if p["id"] != post_id]
-    save_posts(posts)
+    forget_rendered(store.get(post_id))
+    store.delete(post_id)
     return redirect(url_for("index"))
 
+@app.route("/stats/render-cache")
+@admin_required
+def render_cache_stats():
+    return jsonify(render_cache.stats())
+
+@app.route("/metrics")
+@admin_required
+def metrics_view():
+    return jsonify(metrics.snapshot())
+
+# ----------------- Static Export -----------------
+# `flask export` writes the public pages as plain files: /index.html, /page/<n>/index.html
+# and /post/<id>/index.html, so nginx can serve them with `try_files $uri $uri/index.html`.
+# A manifest maps each URL to the hash of what it was rendered from; a re-export only
+# renders URLs whose hash changed and removes files for URLs that no longer exist.
+def export_url(kind, number):
+    if kind == "post":
+        return f"/post/{number}"
+    return "/" if number == 1 else f"/page/{number}"
+
+def export_file(out, url):
+    return Path(out, url.strip("/"), "index.html")
+
+def export_hash(*parts):
+    return hashlib.sha256(json.dumps([BUILD_ID, MARKDOWN_EXTENSIONS, *parts]).encode()).hexdigest()
+
+def export_post(out, post):
+    # Runs in a worker process.
+    url = export_url("post", post["id"])
+    with app.test_request_context(url):
+        html = render_template("post.html", post=dict(post, content_html=render_cache.render(post["content"])),
+                               user=None)
+    path = export_file(out, url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(path, html)
+    return url
+
+def export_index(out, number, page_count, posts):
+    # Runs in a worker process.
+    url = export_url("index", number)
+    posts = [dict(post, content_html=render_cache.render(preview_source(post["content"]))) for post in posts]
+    with app.test_request_context(url):
+        html = render_template(
+            "index.html", posts=posts, user=None,
+            newer_url=export_url("index", number - 1) if number > 1 else None,
+            older_url=export_url("index", number + 1) if number < page_count else None)
+    path = export_file(out, url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    atomic_write(path, html)
+    return url
+
+def export_site(out, workers=None, full=False):
+    out = Path(out)
+    manifest_path = out / EXPORT_MANIFEST
+    old = {} if full else read_json(manifest_path, {})
+    posts = [dict(post) for post in store.newest()]
+    pages = [posts[i:i + PAGE_SIZE] for i in range(0, len(posts), PAGE_SIZE)] or [[]]
+
+    jobs, manifest = [], {}
+    for post in posts:
+        url = export_url("post", post["id"])
+        manifest[url] = export_hash("post", post)
+        jobs.append((url, export_post, (str(out), post)))
+    for number, page in enumerate(pages, 1):
+        url = export_url("index", number)
+        manifest[url] = export_hash("index", number, len(pages), page)
+        jobs.append((url, export_index, (str(out), number, len(pages), page)))
+    jobs = [job for job in jobs if old.get(job[0]) != manifest[job[0]] or not export_file(out, job[0]).exists()]
+
+    out.mkdir(parents=True, exist_ok=True)
+    shutil.copytree(Path(app.root_path, "static"), out / "static", dirs_exist_ok=True)
+    if jobs:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(fn, *args) for _, fn, args in jobs]:
+                future.result()
+    removed = [url for url in old if url not in manifest]
+    for url in removed:
+        path = export_file(out, url)
+        if path.exists():
+            path.unlink()
+        if path.parent != out and not any(path.parent.iterdir()):
+            path.parent.rmdir()
+    atomic_write(manifest_path, json.dumps(manifest, indent=2))
+    return len(jobs), len(manifest) - len(jobs), len(removed)
+
+# ----------------- CLI -----------------
+@app.cli.command("import-json")
+def import_json_command():
+    """Copy posts.json and users.json into the SQLite database."""
+    posts, user_count = SqlitePostStore(DB_FILE).import_json()
+    print(f"Imported {posts} posts and {user_count} users into {DB_FILE}.")
+
+@app.cli.command("export")
+@click.option("--out", default=EXPORT_DIR, show_default=True, help="Directory to write the site to.")
+@click.option("--workers", type=int, default=None, help="Render processes (default: one per CPU).")
+@click.option("--full", is_flag=True, help="Ignore the manifest and render every page.")
+def export_command(out, workers, full):
+    """Pre-render the index and every post to static HTML."""
+    start = time.perf_counter()
+    rendered, unchanged, removed = export_site(out, workers, full)
+    print(f"Exported to {out}: {rendered} rendered, {unchanged} unchanged, {removed} removed "
+          f"in {time.perf_counter() - start:.2f}s.")
+
+@app.cli.command("set-password")
+@click.argument("username")
+@click.password_option()
+def set_password_command(username, password):
+    """Create a user or change their password."""
+    store.set_password_hash(username, hash_password(password))
+    print(f"Password set for {username}.")
+
+@app.cli.command("bench-hash")
+@click.option("--rounds", default=10, help="Hashes to time.")
+def bench_hash_command(rounds):
+    """Time one password hash with the configured scheme and work factor."""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        hash_password("benchmark")
+    elapsed = (time.perf_counter() - start) / rounds
+    print(f"{PASSWORD_SCHEME} {password_params()}: {elapsed * 1000:.1f} ms per hash, "
+          f"~{LOGIN_CONCURRENCY / elapsed:.0f} logins/s per worker at {LOGIN_CONCURRENCY} concurrent")
+
 # ----------------- Run App -----------------
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,101 @@
+import os
+import sys
+import json
+import shutil
+import time
+import random
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# ------------------ Synthetic Posts ------------------
+# Posts come from a seeded RNG, so the same --posts/--seed gives the same blog every run.
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt "
+         "ut labore et dolore magna aliqua python flask markdown cache index search").split()
+
+def paragraph(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+def make_posts(count, rng):
+    start = datetime(2020, 1, 1)
+    return [{
+        "id": i,
+        "title": paragraph(rng, 6),
+        "content": "\n\n".join(["# " + paragraph(rng, 4)] + [paragraph(rng, 60) for _ in range(rng.randint(2, 8))]),
+        "date": (start + timedelta(minutes=i)).strftime("%Y-%m-%d %H:%M:%S"),
+    } for i in range(1, count + 1)]
+
+# ------------------ Measurement ------------------
+def drive(client, requests, make_request):
+    start = time.perf_counter()
+    for i in range(requests):
+        response = make_request(i)
+        if response.status_code >= 400:
+            raise RuntimeError(f"request failed with {response.status_code}")
+    seconds = time.perf_counter() - start
+    return {"requests": requests, "seconds": round(seconds, 4), "requests_per_sec": round(requests / seconds, 1)}
+
+def run(posts, requests, backend, seed):
+    # The app keeps its data in the working directory, so each run gets a fresh one
+    # seeded with posts.json before the app is imported (SQLite imports it on startup).
+    os.environ["BLOG_STORAGE"] = backend
+    cwd = os.getcwd()
+    workdir = tempfile.mkdtemp(prefix="blog_bench_")
+    os.chdir(workdir)
+    try:
+        rng = random.Random(seed)
+        Path("posts.json").write_text(json.dumps(make_posts(posts, rng)))
+        sys.path.insert(0, str(Path(__file__).resolve().parent))
+        import app as blog
+
+        client = blog.app.test_client()
+        client.post("/login", data={"username": "admin", "password": "admin"})
+        ids = [rng.randint(1, posts) for _ in range(requests)] if posts else [1] * requests
+        scenarios = {
+            "index": lambda i: client.get("/"),
+            "post": lambda i: client.get(f"/post/{ids[i]}"),
+            "new_post": lambda i: client.post("/new", data={"title": f"Bench {i}", "content": paragraph(rng, 80)}),
+        }
+        results = {}
+        for name, make_request in scenarios.items():
+            if name == "post" and not posts:
+                continue
+            print(f"Running {name}...", flush=True)
+            results[name] = drive(client, requests, make_request)
+        return results, client.get("/metrics").get_json()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+# ------------------ CLI ------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FlaskBlog benchmark")
+    parser.add_argument("--posts", type=int, default=1000, help="Synthetic posts to seed")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--backend", choices=["json", "sqlite"], default="json")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON file to write")
+    args = parser.parse_args()
+    out = Path(args.out).resolve()
+
+    results, latency = run(args.posts, args.requests, args.backend, args.seed)
+    for name, result in results.items():
+        timing = latency.get(name, {}).get("total", {})
+        print(f"  {name}: {result['requests_per_sec']} req/s, p50 {timing.get('p50_ms')} ms, "
+              f"p95 {timing.get('p95_ms')} ms, p99 {timing.get('p99_ms')} ms")
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": args.backend,
+        "posts": args.posts,
+        "requests": args.requests,
+        "seed": args.seed,
+        "results": results,
+        "latency": latency,
+    }
+    out.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {out}")
@@ -4,7 +4,21 @@ from pathlib import Path
 from datetime import datetime
 import json
 import hashlib
+import fnmatch
+import re
 import argparse
+import errno
+import threading
+import sqlite3
+import time
+import queue
+import select
+import signal
+import struct
+import ctypes
+import ctypes.util
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 import tkinter as tk
 from tkinter import filedialog, messagebox, BooleanVar, Checkbutton, Text, Scrollbar, END
 
@@ -19,6 +33,77 @@ DEFAULT_FILE_TYPES = {
 
 UNDO_FOLDER = ".file_organizer_undo"
 CUSTOM_CATEGORIES_FILE = "custom_categories.json"
+PARTIAL_HASH_BYTES = 256 * 1024
+HASH_CACHE_FILE = ".file_organizer_hashes.db"
+HASH_CACHE_MAX_AGE_DAYS = 30
+MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+JOURNAL_BATCH = 256
+COPY_CHUNK = 8 * 1024 * 1024
+COPY_CONCURRENCY = 2
+WATCH_DEBOUNCE = 2.0
+WATCH_POLL_INTERVAL = 5.0
+WATCH_QUEUE_SIZE = 10000
+WATCH_PENDING_SIZE = 1000
+WATCH_IGNORE_SUFFIXES = (".part", ".crdownload", ".download", ".tmp")
+GUI_POLL_MS = 100
+
+Move = namedtuple("Move", ["src", "dest", "category"])
+
+class OrganizeCancelled(Exception):
+    pass
+
+class Progress:
+    # Counters shared between a worker thread and a UI. Workers call add() as they go and
+    # check() at file boundaries; cancel() makes the next check() raise OrganizeCancelled.
+    # When `events` (a queue.Queue) is given, ("progress", snapshot) events are put on it at
+    # most every `interval` seconds.
+    def __init__(self, events=None, interval=0.2):
+        self.events = events
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.cancel_event = threading.Event()
+        self.counters = {"files_scanned": 0, "bytes_to_hash": 0, "bytes_hashed": 0,
+                         "files_planned": 0, "files_moved": 0}
+        self.phase_started = {}
+        self.last_emit = 0.0
+
+    def add(self, **deltas):
+        now = time.monotonic()
+        with self.lock:
+            for key, value in deltas.items():
+                self.counters[key] += value
+                self.phase_started.setdefault(key, now)
+            due = self.events is not None and now - self.last_emit >= self.interval
+            if due:
+                self.last_emit = now
+        if due:
+            self.events.put(("progress", self.snapshot()))
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self.lock:
+            c = dict(self.counters)
+            started = dict(self.phase_started)
+
+        def rate(key):
+            return c[key] / max(now - started.get(key, now), 1e-9)
+
+        eta = None
+        if c["files_planned"]:
+            if c["files_moved"]:
+                eta = (c["files_planned"] - c["files_moved"]) / rate("files_moved")
+        elif c["bytes_hashed"]:
+            eta = (c["bytes_to_hash"] - c["bytes_hashed"]) / rate("bytes_hashed")
+        c["files_per_sec"] = rate("files_moved") if c["files_moved"] else 0.0
+        c["eta"] = eta
+        return c
+
+    def check(self):
+        if self.cancel_event.is_set():
+            raise OrganizeCancelled()
+
+    def cancel(self):
+        self.cancel_event.set()
 
 # ------------------ Category Handling ------------------
 def load_custom_categories():
@@ -31,6 +116,191 @@ def save_custom_categories(categories_dict):
     with open(CUSTOM_CATEGORIES_FILE, "w", encoding="utf-8") as f:
         json.dump(categories_dict, f, indent=2)
 
+# ------------------ Hash Cache ------------------
+class HashCache:
+    # Persistent digest index keyed by (device, inode). Rows also store size and mtime_ns,
+    # so an entry is only trusted while the file is unchanged. Moves within a device keep
+    # the inode, so digests survive organizing and are reused by later runs.
+    # A read_only cache opens an existing database without writing to it (previews).
+    def __init__(self, folder_path, read_only=False):
+        self.path = Path(folder_path) / HASH_CACHE_FILE
+        self.read_only = read_only
+        if read_only:
+            self.conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        else:
+            self.conn = sqlite3.connect(str(self.path))
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS hashes ("
+                "dev INTEGER, ino INTEGER, size INTEGER, mtime_ns INTEGER, "
+                "partial TEXT, full TEXT, last_seen REAL, PRIMARY KEY (dev, ino))"
+            )
+        self.pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _row(self, st):
+        key = (st.st_dev, st.st_ino)
+        if key in self.pending:
+            return self.pending[key]
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, partial, full FROM hashes WHERE dev = ? AND ino = ?", key
+        ).fetchone()
+        if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            entry = {"size": row[0], "mtime_ns": row[1], "partial": row[2], "full": row[3]}
+        else:
+            entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "partial": None, "full": None}
+        self.pending[key] = entry
+        return entry
+
+    def get(self, st, kind):
+        value = self._row(st)[kind]
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def put(self, st, kind, digest):
+        self._row(st)[kind] = digest
+
+    def flush(self):
+        if self.read_only:
+            self.pending.clear()
+            return
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO hashes VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(dev, ino, e["size"], e["mtime_ns"], e["partial"], e["full"], now)
+             for (dev, ino), e in self.pending.items()],
+        )
+        self.conn.commit()
+        self.pending.clear()
+
+    def evict(self, max_age_days=HASH_CACHE_MAX_AGE_DAYS):
+        cutoff = time.time() - max_age_days * 86400
+        removed = self.conn.execute("DELETE FROM hashes WHERE last_seen < ?", (cutoff,)).rowcount
+        self.conn.commit()
+        return removed
+
+    def stats(self):
+        count, oldest, newest = self.conn.execute(
+            "SELECT COUNT(*), MIN(last_seen), MAX(last_seen) FROM hashes"
+        ).fetchone()
+        return {
+            "entries": count,
+            "oldest": datetime.fromtimestamp(oldest).isoformat() if oldest else None,
+            "newest": datetime.fromtimestamp(newest).isoformat() if newest else None,
+            "size_bytes": self.path.stat().st_size,
+        }
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+# ------------------ Category Index ------------------
+# (offset, magic bytes, mime type, extension) used to classify files that have no suffix.
+MAGIC_SIGNATURES = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png", ".png"),
+    (0, b"\xff\xd8\xff", "image/jpeg", ".jpg"),
+    (0, b"GIF87a", "image/gif", ".gif"),
+    (0, b"GIF89a", "image/gif", ".gif"),
+    (0, b"%PDF-", "application/pdf", ".pdf"),
+    (0, b"PK\x03\x04", "application/zip", ".zip"),
+    (0, b"Rar!\x1a\x07", "application/vnd.rar", ".rar"),
+    (0, b"\x1f\x8b", "application/gzip", ".gz"),
+    (257, b"ustar", "application/x-tar", ".tar"),
+    (0, b"ID3", "audio/mpeg", ".mp3"),
+    (0, b"fLaC", "audio/flac", ".flac"),
+    (8, b"WAVE", "audio/wav", ".wav"),
+    (8, b"AVI ", "video/x-msvideo", ".avi"),
+    (0, b"\x1a\x45\xdf\xa3", "video/x-matroska", ".mkv"),
+]
+# ISO media files have "ftyp" at offset 4, then a brand saying what they hold.
+FTYP_BRANDS = {
+    b"isom": ("video/mp4", ".mp4"), b"iso2": ("video/mp4", ".mp4"), b"mp41": ("video/mp4", ".mp4"),
+    b"mp42": ("video/mp4", ".mp4"), b"avc1": ("video/mp4", ".mp4"), b"M4V ": ("video/mp4", ".mp4"),
+    b"qt  ": ("video/quicktime", ".mov"),
+    b"M4A ": ("audio/mp4", ".m4a"), b"M4B ": ("audio/mp4", ".m4a"),
+    b"heic": ("image/heic", ".heic"), b"heix": ("image/heic", ".heic"), b"mif1": ("image/heif", ".heif"),
+}
+BMP_HEADER_SIZES = {12, 40, 52, 56, 64, 108, 124}
+MAGIC_READ_BYTES = max(offset + len(magic) for offset, magic, _, _ in MAGIC_SIGNATURES)
+
+def sniff_type(file_path):
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(MAGIC_READ_BYTES)
+    except OSError:
+        return None, None
+    if head[4:8] == b"ftyp":
+        return FTYP_BRANDS.get(head[8:12], (None, None))
+    if head[:2] == b"BM" and len(head) >= 18:
+        # "BM" alone matches plenty of text; a real bitmap has zero reserved bytes and a
+        # known DIB header size.
+        reserved, _, header_size = struct.unpack_from("<III", head, 6)
+        if reserved == 0 and header_size in BMP_HEADER_SIZES:
+            return "image/bmp", ".bmp"
+    if head[:4] == b"PK\x03\x04" and head[30:38] == b"mimetype":
+        # EPUB and OpenDocument files are zips whose first, stored entry names their type.
+        size = struct.unpack_from("<I", head, 18)[0]
+        return head[38:38 + size].decode("ascii", "replace"), None
+    for offset, magic, mime, ext in MAGIC_SIGNATURES:
+        if head[offset:offset + len(magic)] == magic:
+            return mime, ext
+    return None, None
+
+def is_pattern(rule):
+    return any(c in rule for c in "*?[/")
+
+class CategoryIndex:
+    # Compiled form of a {category: [rules]} mapping. Rules are plain suffixes (".jpg",
+    # ".tar.gz"), filename globs ("IMG_*", "*.part?") or MIME patterns ("image/*").
+    # Lookup order matches the dict: the first category listing a rule wins.
+    def __init__(self, file_types, sniff=True):
+        self.categories = list(file_types)
+        self.suffixes = {}
+        self.max_parts = 1
+        globs = []
+        self.mimes = []
+        for category, rules in file_types.items():
+            for rule in rules:
+                rule = rule.strip().lower()
+                if "/" in rule:
+                    self.mimes.append((rule, category))
+                elif is_pattern(rule):
+                    globs.append((rule, category))
+                elif rule:
+                    self.suffixes.setdefault(rule, category)
+                    self.max_parts = max(self.max_parts, rule.count("."))
+        self.globs = [(re.compile(fnmatch.translate(rule)), category) for rule, category in globs]
+        self.sniff = sniff
+
+    def lookup(self, file_path):
+        path = Path(file_path)
+        parts = [s.lower() for s in path.suffixes]
+        for n in range(min(len(parts), self.max_parts), 0, -1):
+            category = self.suffixes.get("".join(parts[-n:]))
+            if category:
+                return category
+        name = path.name.lower()
+        for regex, category in self.globs:
+            if regex.match(name):
+                return category
+        if self.sniff and not path.suffix:
+            # A suffix nothing matched is still the user's label, so only sniff files without one.
+            mime, ext = sniff_type(path)
+            if mime:
+                for rule, category in self.mimes:
+                    if fnmatch.fnmatchcase(mime, rule):
+                        return category
+                return self.suffixes.get(ext, "Others")
+        return "Others"
+
+def compile_categories(custom_rules=None, sniff=True):
+    if isinstance(custom_rules, CategoryIndex):
+        return custom_rules
+    return CategoryIndex(custom_rules if custom_rules else DEFAULT_FILE_TYPES, sniff)
+
 # ------------------ Core Functions ------------------
 def get_file_hash(file_path):
     h = hashlib.sha256()
@@ -39,87 +309,796 @@ def get_file_hash(file_path):
             h.update(chunk)
     return h.hexdigest()
 
-def organize_folder(folder_path, by_date=False, custom_rules=None, safe_mode=False, log_list=None):
+def get_partial_hash(file_path, size):
+    # Hashes only the head and tail of the file. Small files are read whole, in which
+    # case the digest is identical to get_file_hash() and the third value is True.
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        if size <= 2 * PARTIAL_HASH_BYTES:
+            h.update(f.read())
+            return h.hexdigest(), size, True
+        h.update(f.read(PARTIAL_HASH_BYTES))
+        f.seek(-PARTIAL_HASH_BYTES, os.SEEK_END)
+        h.update(f.read(PARTIAL_HASH_BYTES))
+    return h.hexdigest(), 2 * PARTIAL_HASH_BYTES, False
+
+def new_stats():
+    return {"files": 0, "bytes_total": 0, "bytes_read": 0, "bytes_skipped": 0, "cache_hits": 0,
+            "devices": {}}
+
+def map_bounded(fn, items, workers=1, weight=None, max_inflight=MAX_INFLIGHT_BYTES):
+    # Ordered map over a thread pool that keeps at most `max_inflight` (by `weight`) submitted
+    # at once, so a few huge files cannot queue the whole share for reading.
+    if workers <= 1 or len(items) < 2:
+        return [fn(item) for item in items]
+    results = [None] * len(items)
+    pending = {}
+    inflight = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i, item in enumerate(items):
+            w = weight(item) if weight else 0
+            while pending and inflight + w > max_inflight:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    j, wj = pending.pop(fut)
+                    results[j] = fut.result()
+                    inflight -= wj
+            pending[pool.submit(fn, item)] = (i, w)
+            inflight += w
+        for fut, (j, _) in pending.items():
+            results[j] = fut.result()
+    return results
+
+def find_duplicates(files, stats=None, cache=None, workers=1, progress=None, max_inflight=MAX_INFLIGHT_BYTES):
+    # files: list of (path, stat_result) in processing order. Returns the paths that repeat
+    # the content of an earlier entry. Files are grouped by size first, size collisions get
+    # a head/tail hash, and only partial-hash collisions are hashed in full. Digests found
+    # in `cache` (a HashCache) are reused instead of reading the file again. Hashing runs on
+    # `workers` threads; the cache is only touched from the calling thread.
+    if stats is None:
+        stats = new_stats()
+    by_size = {}
+    for path, st in files:
+        by_size.setdefault(st.st_size, []).append((path, st))
+        stats["files"] += 1
+        stats["bytes_total"] += st.st_size
+
+    def lookup(st, kind):
+        if cache is None:
+            return None
+        digest = cache.get(st, kind)
+        if digest is not None:
+            stats["cache_hits"] += 1
+        return digest
+
+    digests = {}
+    bytes_read = {}
+    partials = {}
+    to_hash = []
+    for size, entries in by_size.items():
+        if len(entries) < 2:
+            continue
+        for path, st in entries:
+            partial = lookup(st, "partial")
+            if partial is None:
+                to_hash.append((path, st))
+            else:
+                partials[path] = partial
+    def hash_partial(entry):
+        if progress is not None:
+            progress.check()
+        result = get_partial_hash(entry[0], entry[1].st_size)
+        if progress is not None:
+            progress.add(bytes_hashed=result[1])
+        return result
+
+    def hash_full(entry):
+        if progress is not None:
+            progress.check()
+        result = get_file_hash(entry[0])
+        if progress is not None:
+            progress.add(bytes_hashed=entry[1].st_size)
+        return result
+
+    if progress is not None:
+        progress.add(bytes_to_hash=sum(min(st.st_size, 2 * PARTIAL_HASH_BYTES) for _, st in to_hash))
+    results = map_bounded(hash_partial, to_hash, workers,
+                          weight=lambda e: min(e[1].st_size, 2 * PARTIAL_HASH_BYTES), max_inflight=max_inflight)
+    for (path, st), (partial, read, _) in zip(to_hash, results):
+        partials[path] = partial
+        bytes_read[path] = read
+        if cache is not None:
+            cache.put(st, "partial", partial)
+
+    by_partial = {}
+    for size, entries in by_size.items():
+        if len(entries) < 2:
+            continue
+        for path, st in entries:
+            if size <= 2 * PARTIAL_HASH_BYTES:
+                digests[path] = partials[path]
+            else:
+                by_partial.setdefault((size, partials[path]), []).append((path, st))
+
+    to_hash = []
+    for candidates in by_partial.values():
+        if len(candidates) < 2:
+            continue
+        for path, st in candidates:
+            full = lookup(st, "full")
+            if full is None:
+                to_hash.append((path, st))
+            else:
+                digests[path] = full
+    if progress is not None:
+        progress.add(bytes_to_hash=sum(st.st_size for _, st in to_hash))
+    results = map_bounded(hash_full, to_hash, workers,
+                          weight=lambda e: e[1].st_size, max_inflight=max_inflight)
+    for (path, st), full in zip(to_hash, results):
+        digests[path] = full
+        bytes_read[path] = bytes_read.get(path, 0) + st.st_size
+        if cache is not None:
+            cache.put(st, "full", full)
+
+    for path, st in files:
+        read = bytes_read.get(path, 0)
+        stats["bytes_read"] += read
+        stats["bytes_skipped"] += max(st.st_size - read, 0)
+
+    duplicates = set()
+    hashes_seen = set()
+    for path, _ in files:
+        file_hash = digests.get(path)
+        if file_hash is None:
+            continue
+        if file_hash in hashes_seen:
+            duplicates.add(path)
+        else:
+            hashes_seen.add(file_hash)
+    return duplicates
+
+def format_stats(stats):
+    mb = 1024 * 1024
+    return (f"Scanned {stats['files']} files ({stats['bytes_total'] / mb:.1f} MB): "
+            f"read {stats['bytes_read'] / mb:.1f} MB, skipped {stats['bytes_skipped'] / mb:.1f} MB, "
+            f"{stats['cache_hits']} cached digest(s)"
+            + "".join(f"\n  {route}: {d['files']} file(s) in {d['seconds']:.2f}s, "
+                      f"{d['files'] / max(d['seconds'], 1e-9):.0f} files/s"
+                      + (f", {d['bytes'] / mb / max(d['seconds'], 1e-9):.1f} MB/s copied" if d["bytes"] else "")
+                      for route, d in stats.get("devices", {}).items()))
+
+def scan_folder(folder, recursive=False, skip_dirs=()):
+    # Streams (path, stat_result) for regular files using os.scandir, reusing the DirEntry
+    # type/stat data instead of separate is_file()/stat() calls. Entries are yielded in
+    # name order so plans are stable between runs. In recursive mode, directories named in
+    # `skip_dirs` directly under `folder` (our own output folders) are not descended into.
+    stack = [(str(folder), True)]
+    while stack:
+        path, top = stack.pop()
+        subdirs = []
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        for entry in entries:
+            if entry.is_file():
+                if not entry.name.startswith(HASH_CACHE_FILE):
+                    yield Path(entry.path), entry.stat()
+            elif recursive and entry.is_dir(follow_symlinks=False):
+                if entry.name == UNDO_FOLDER or (top and entry.name in skip_dirs):
+                    continue
+                subdirs.append(entry.path)
+        stack.extend((d, False) for d in reversed(subdirs))
+
+def unique_dest(dest, taken):
+    candidate = dest
+    n = 1
+    while candidate in taken or candidate.exists():
+        candidate = dest.with_name(f"{dest.stem}_{n}{dest.suffix}")
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+def target_folder_for(folder, category, st, by_date=False):
+    target_folder = folder / category
+    if by_date and category != "Duplicates":
+        modified_time = datetime.fromtimestamp(st.st_mtime)
+        target_folder = target_folder / str(modified_time.year) / f"{modified_time.month:02}"
+    return target_folder
+
+def build_plan(folder_path, by_date=False, custom_rules=None, stats=None, use_cache=True, workers=1, recursive=False, progress=None, read_only_cache=False, max_inflight=MAX_INFLIGHT_BYTES):
+    # Generator of Move entries for `folder_path`. Nothing is moved: the plan can be
+    # previewed (safe mode), saved and diffed, then handed to execute_plan(). With
+    # `read_only_cache` an existing hash cache is used but not updated, and none is created.
     folder = Path(folder_path)
     if not folder.exists() or not folder.is_dir():
         raise ValueError(f"Folder {folder_path} does not exist or is not a directory.")
+    index = compile_categories(custom_rules)
 
-    moved_files = []
-    hashes_seen = set()
-    file_types = custom_rules if custom_rules else DEFAULT_FILE_TYPES
+    skip_dirs = set(index.categories) | {"Duplicates", "Others"}
+    files = list(scan_folder(folder, recursive, skip_dirs))
+    if progress is not None:
+        progress.add(files_scanned=len(files))
+    cache = None
+    if use_cache and not read_only_cache:
+        cache = HashCache(folder)
+    elif use_cache and (folder / HASH_CACHE_FILE).exists():
+        cache = HashCache(folder, read_only=True)
+    try:
+        duplicates = find_duplicates(files, stats, cache, workers, progress, max_inflight)
+    finally:
+        if cache is not None:
+            cache.close()
 
-    for file in folder.iterdir():
-        if file.is_file():
-            file_hash = get_file_hash(file)
-            if file_hash in hashes_seen:
-                target_folder = folder / "Duplicates"
-            else:
-                hashes_seen.add(file_hash)
-                target_folder = None
-                for category, extensions in file_types.items():
-                    if file.suffix.lower() in extensions:
-                        target_folder = folder / category
+    taken = set()
+    for file, st in files:
+        category = "Duplicates" if file in duplicates else index.lookup(file)
+        target_folder = target_folder_for(folder, category, st, by_date)
+        yield Move(str(file), str(unique_dest(target_folder / file.name, taken)), category)
+
+# ------------------ Move Engine ------------------
+def copy_file_fast(src, dest):
+    # Kernel-side copy via copy_file_range, then sendfile, then a plain buffered copy for
+    # whatever could not be transferred (other platforms, unsupported filesystems).
+    with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+        infd, outfd = fsrc.fileno(), fdst.fileno()
+        size = os.fstat(infd).st_size
+        copied = 0
+        for copier in ("copy_file_range", "sendfile"):
+            if copied or not hasattr(os, copier):
+                continue
+            try:
+                while copied < size:
+                    if copier == "copy_file_range":
+                        n = os.copy_file_range(infd, outfd, COPY_CHUNK)
+                    else:
+                        n = os.sendfile(outfd, infd, copied, COPY_CHUNK)
+                    if n == 0:
                         break
-                if not target_folder:
-                    target_folder = folder / "Others"
+                    copied += n
+            except OSError as e:
+                if copied or e.errno not in (errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+                    raise
+        if copied < size:
+            fsrc.seek(copied)
+            fdst.seek(copied)
+            shutil.copyfileobj(fsrc, fdst, COPY_CHUNK)
+    shutil.copystat(src, dest)
+    return size
 
-                if by_date:
-                    modified_time = datetime.fromtimestamp(file.stat().st_mtime)
-                    target_folder = target_folder / str(modified_time.year) / f"{modified_time.month:02}"
+class MoveEngine:
+    # Replaces per-file shutil.move. The device of each directory is looked up once; moves
+    # within a device are a single os.rename, moves across devices are a zero-copy transfer
+    # plus unlink, limited to `max_copies` at a time. Timings are kept per device pair.
+    def __init__(self, max_copies=COPY_CONCURRENCY):
+        self.dir_devs = {}
+        self.copy_slots = threading.BoundedSemaphore(max_copies)
+        self.lock = threading.Lock()
+        self.devices = {}
 
-            target_folder.mkdir(parents=True, exist_ok=True)
-            dest = target_folder / file.name
+    def _dev(self, path):
+        parent = os.path.dirname(os.path.abspath(path))
+        dev = self.dir_devs.get(parent)
+        if dev is None:
+            dev = self.dir_devs[parent] = os.stat(parent).st_dev
+        return dev
 
-            if safe_mode:
-                moved_files.append({"src": str(file), "dest": str(dest)})
-            else:
-                shutil.move(str(file), str(dest))
-                moved_files.append({"src": str(file), "dest": str(dest)})
-                if log_list is not None:
-                    log_list.append(f"{file} -> {dest}")
+    def _copy(self, src, dest):
+        with self.copy_slots:
+            size = copy_file_fast(src, dest)
+        os.unlink(src)
+        return size
 
-    if moved_files and not safe_mode:
-        undo_path = folder / UNDO_FOLDER
-        undo_path.mkdir(exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        with open(undo_path / f"undo_{timestamp}.json", "w", encoding="utf-8") as f:
-            json.dump(moved_files, f, indent=2)
+    def move(self, src, dest):
+        src_dev, dest_dev = self._dev(src), self._dev(dest)
+        start = time.perf_counter()
+        copied = 0
+        if src_dev == dest_dev:
+            try:
+                os.rename(src, dest)
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+                copied = self._copy(src, dest)
+        else:
+            copied = self._copy(src, dest)
+        elapsed = time.perf_counter() - start
+        route = f"dev {src_dev}" if src_dev == dest_dev else f"dev {src_dev} -> {dest_dev}"
+        with self.lock:
+            d = self.devices.setdefault(route, {"files": 0, "bytes": 0, "seconds": 0.0})
+            d["files"] += 1
+            d["bytes"] += copied
+            d["seconds"] += elapsed
+
+# ------------------ Journal ------------------
+class MoveJournal:
+    # Append-only write-ahead log of moves (one {"src", "dest"} JSON object per line).
+    # Entries are written and fsynced in batches *before* the batch is moved, so after a
+    # crash every file that may have moved is recorded.
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file = open(self.path, "a", encoding="utf-8")
+
+    def write(self, moves):
+        self.file.write("".join(json.dumps({"src": m.src, "dest": m.dest}) + "\n" for m in moves))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
 
+def read_lines_reversed(path, block_size=64 * 1024):
+    # Yields the lines of a text file last-to-first, reading it backwards in blocks.
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        tail = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + tail).split(b"\n")
+            tail = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode("utf-8")
+        if tail.strip():
+            yield tail.decode("utf-8")
+
+def iter_jsonl(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for item in records:
+            f.write(json.dumps(item) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def execute_plan(plan, workers=1, log_list=None, journal=None, batch_size=JOURNAL_BATCH, stats=None, progress=None, engine=None):
+    # Creates target folders once, then moves in plan order (or on `workers` threads, with
+    # results still reported in plan order). Returns the undo records. A cancelled
+    # `progress` stops before the next file; journaled but unmoved entries are harmless to
+    # undo and are picked up by resume_folder(). A shared `engine` is left for the caller
+    # to report in its stats.
+    plan = tuple(plan)
+    own_engine = engine is None
+    if own_engine:
+        engine = MoveEngine()
+
+    def move_one(move):
+        if progress is not None:
+            if progress.cancel_event.is_set():
+                return False
+        engine.move(move.src, move.dest)
+        if progress is not None:
+            progress.add(files_moved=1)
+        return True
+
+    if progress is not None:
+        progress.add(files_planned=len(plan))
+    for parent in dict.fromkeys(Path(move.dest).parent for move in plan):
+        parent.mkdir(parents=True, exist_ok=True)
+    moved_files = []
+    for start in range(0, len(plan), batch_size):
+        chunk = plan[start:start + batch_size]
+        if journal is not None:
+            journal.write(chunk)
+        done = map_bounded(move_one, chunk, workers)
+        for move, moved in zip(chunk, done):
+            if not moved:
+                continue
+            moved_files.append({"src": move.src, "dest": move.dest})
+            if log_list is not None:
+                log_list.append(f"{move.src} -> {move.dest}")
+        if progress is not None:
+            progress.check()
+    if stats is not None and own_engine:
+        merge_stats(stats, {"devices": engine.devices})
+    return moved_files
+
+def save_plan(records, path):
+    # One {"src", "dest"} object per line, so plans from two runs diff cleanly.
+    write_jsonl(path, records)
+
+def run_journaled(folder_path, plan, workers=1, log_list=None, run_id=None, done=0, stats=None, progress=None, engine=None):
+    # Persists the plan, then executes it from index `done` under a MoveJournal. The plan
+    # file is removed once every move has been made; a leftover plan marks an interrupted
+    # run that resume_folder() can finish.
+    undo_path = Path(folder_path) / UNDO_FOLDER
+    undo_path.mkdir(exist_ok=True)
+    if run_id is None:
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        write_jsonl(undo_path / f"plan_{run_id}.jsonl", (m._asdict() for m in plan))
+    journal = MoveJournal(undo_path / f"undo_{run_id}.jsonl")
+    try:
+        moved_files = execute_plan(plan[done:], workers, log_list, journal, stats=stats, progress=progress, engine=engine)
+    finally:
+        journal.close()
+    (undo_path / f"plan_{run_id}.jsonl").unlink()
+    return moved_files
+
+def organize_folder(folder_path, by_date=False, custom_rules=None, safe_mode=False, log_list=None, stats=None, use_cache=True, workers=1, recursive=False, progress=None, max_inflight=MAX_INFLIGHT_BYTES, engine=None):
+    plan = tuple(build_plan(folder_path, by_date, custom_rules, stats, use_cache, workers, recursive, progress,
+                            read_only_cache=safe_mode, max_inflight=max_inflight))
+    if safe_mode or not plan:
+        return [{"src": move.src, "dest": move.dest} for move in plan]
+    return run_journaled(folder_path, plan, workers, log_list, stats=stats, progress=progress, engine=engine)
+
+def resume_folder(folder_path, workers=1, log_list=None):
+    # Finishes the most recent interrupted run: entries already in its journal are skipped,
+    # except that the last journaled batch may be half done, so those are re-checked.
+    undo_path = Path(folder_path) / UNDO_FOLDER
+    plans = sorted(undo_path.glob("plan_*.jsonl"), reverse=True) if undo_path.exists() else []
+    if not plans:
+        print("No interrupted run found.")
+        return []
+    run_id = plans[0].stem[len("plan_"):]
+    plan = tuple(Move(**item) for item in iter_jsonl(plans[0]))
+
+    journal_path = undo_path / f"undo_{run_id}.jsonl"
+    done = 0
+    if journal_path.exists():
+        done = sum(1 for _ in iter_jsonl(journal_path))
+    engine = MoveEngine()
+    moved_files = []
+    for move in plan[max(done - JOURNAL_BATCH, 0):done]:
+        if os.path.exists(move.src) and not os.path.exists(move.dest):
+            Path(move.dest).parent.mkdir(parents=True, exist_ok=True)
+            engine.move(move.src, move.dest)
+            moved_files.append({"src": move.src, "dest": move.dest})
+            if log_list is not None:
+                log_list.append(f"{move.src} -> {move.dest}")
+
+    moved_files += run_journaled(folder_path, plan, workers, log_list, run_id, done, engine=engine)
+    print(f"Resumed run {run_id}: moved {len(moved_files)} remaining files.")
     return moved_files
 
-def undo_last(folder_path):
+def undo_last(folder_path, progress=None):
+    # Reverts the newest journal, last move first. A cancelled `progress` stops before the
+    # next file and keeps the journal; running undo again skips files already put back.
     folder = Path(folder_path)
     undo_path = folder / UNDO_FOLDER
     if not undo_path.exists():
         print("No undo history found.")
         return
 
-    undo_files = sorted(undo_path.glob("undo_*.json"), reverse=True)
+    undo_files = sorted(undo_path.glob("undo_*.json*"), reverse=True)
     if not undo_files:
         print("No undo snapshots found.")
         return
 
     latest = undo_files[0]
-    with open(latest, "r", encoding="utf-8") as f:
-        moved_files = json.load(f)
+    if latest.suffix == ".jsonl":
+        records = (json.loads(line) for line in read_lines_reversed(latest))
+        total = sum(1 for _ in read_lines_reversed(latest)) if progress is not None else 0
+    else:
+        # Snapshots written before the journal existed.
+        with open(latest, "r", encoding="utf-8") as f:
+            records = json.load(f)[::-1]
+        total = len(records)
+    if progress is not None:
+        progress.add(files_planned=total)
 
-    for item in reversed(moved_files):
+    engine = MoveEngine()
+    count = 0
+    for item in records:
+        if progress is not None:
+            progress.check()
         src = Path(item["dest"])
         dest = Path(item["src"])
         dest.parent.mkdir(parents=True, exist_ok=True)
         if src.exists():
-            shutil.move(str(src), str(dest))
+            engine.move(str(src), str(dest))
+        count += 1
+        if progress is not None:
+            progress.add(files_moved=1)
 
     latest.unlink()
-    print(f"Reverted {len(moved_files)} files from last operation.")
+    plan_file = undo_path / f"plan_{latest.stem[len('undo_'):]}.jsonl"
+    if plan_file.exists():
+        plan_file.unlink()
+    print(f"Reverted {count} files from last operation.")
+    return count
+
+def merge_stats(total, part):
+    for key, value in part.items():
+        if isinstance(value, dict):
+            merge_stats(total.setdefault(key, {}), value)
+        else:
+            total[key] = total.get(key, 0) + value
+
+def batch_organize(folders, by_date=False, custom_rules=None, safe_mode=False, log_list=None, stats=None, use_cache=True, workers=1, recursive=False, progress=None):
+    # With workers > 1 the folders are organized concurrently; each one collects its own
+    # log and stats so the merged results keep the folder order of a sequential run.
+    # Folders running at once split `workers` and the in-flight byte budget between them
+    # and share one MoveEngine, so the totals stay those of a single folder.
+    # Category rules are compiled once and shared by every folder.
+    custom_rules = compile_categories(custom_rules)
+    folders = list(folders)
+    folder_workers = max(min(workers, len(folders)), 1)
+    concurrent = folder_workers > 1
+    inner_workers = max(workers // folder_workers, 1)
+    max_inflight = MAX_INFLIGHT_BYTES // folder_workers
+    engine = MoveEngine()
+    def run(folder):
+        folder_log = [] if concurrent and log_list is not None else log_list
+        folder_stats = new_stats()
+        moved = organize_folder(folder, by_date, custom_rules, safe_mode, folder_log, folder_stats, use_cache,
+                                inner_workers, recursive, progress, max_inflight, engine)
+        return moved, folder_log, folder_stats
 
-def batch_organize(folders, by_date=False, custom_rules=None, safe_mode=False, log_list=None):
     all_moved = []
-    for folder in folders:
-        moved = organize_folder(folder, by_date, custom_rules, safe_mode, log_list)
+    for moved, folder_log, folder_stats in map_bounded(run, folders, folder_workers):
         all_moved.extend(moved)
+        if concurrent and log_list is not None:
+            log_list.extend(folder_log)
+        if stats is not None:
+            merge_stats(stats, folder_stats)
+    if stats is not None:
+        merge_stats(stats, {"devices": engine.devices})
     return all_moved
 
+# ------------------ Watch Mode ------------------
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+RESCAN = None  # queued when events may have been lost; the watcher rescans the folder
+
+class InotifySource:
+    # Minimal ctypes binding to Linux inotify for a single directory.
+    def __init__(self, folder_path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init()
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init failed")
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder_path), IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder_path}")
+
+    def read(self, timeout):
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = struct.unpack_from("iIII", data, offset)
+            offset += 16
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                names.append(RESCAN)
+            elif name and not mask & IN_ISDIR:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+class DedupIndex:
+    # size -> [path, stat, digest] for files already organized. Digests come from the hash
+    # cache when available and are otherwise computed only when a new file shares a size.
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.by_size = {}
+
+    def add(self, path, st, digest=None):
+        if digest is None and self.cache is not None:
+            digest = self.cache.get(st, "full")
+        self.by_size.setdefault(st.st_size, []).append([path, st, digest])
+
+    def _digest(self, entry):
+        if entry[2] is None:
+            entry[2] = get_file_hash(entry[0])
+            if self.cache is not None:
+                self.cache.put(entry[1], "full", entry[2])
+        return entry[2]
+
+    def check(self, path, st):
+        # Returns (is_duplicate, digest-or-None).
+        entries = self.by_size.get(st.st_size)
+        if not entries:
+            return False, None
+        new_entry = [path, st, self.cache.get(st, "full") if self.cache is not None else None]
+        digest = self._digest(new_entry)
+        for entry in entries:
+            try:
+                if self._digest(entry) == digest:
+                    return True, digest
+            except OSError:
+                continue
+        return False, digest
+
+class FolderWatcher:
+    # Organizes files as they land in `folder_path` (top level only). A producer thread
+    # feeds file names into a bounded queue, using inotify or polling, and blocks when the
+    # queue is full. The consumer waits until a file's size and mtime have stayed the same
+    # for `debounce` seconds, then categorizes, dedups and moves it like organize_folder.
+    # It debounces at most `pending_size` files at a time and leaves the rest in the queue,
+    # so a flood of arrivals blocks the producer instead of growing memory and stat() work.
+    def __init__(self, folder_path, by_date=False, custom_rules=None, use_cache=True, log_list=None,
+                 debounce=WATCH_DEBOUNCE, poll=False, queue_size=WATCH_QUEUE_SIZE, pending_size=WATCH_PENDING_SIZE):
+        self.folder = Path(folder_path)
+        if not self.folder.is_dir():
+            raise ValueError(f"Folder {folder_path} does not exist or is not a directory.")
+        self.by_date = by_date
+        self.index = compile_categories(custom_rules)
+        self.use_cache = use_cache
+        self.log_list = log_list
+        self.debounce = debounce
+        self.poll = poll
+        self.events = queue.Queue(maxsize=queue_size)
+        self.pending_size = pending_size
+        self.stop_event = threading.Event()
+        self.moved = 0
+
+    def _wanted(self, name):
+        return not (name.startswith(HASH_CACHE_FILE) or name.lower().endswith(WATCH_IGNORE_SUFFIXES))
+
+    def _put(self, item):
+        while not self.stop_event.is_set():
+            try:
+                self.events.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _produce_inotify(self, source):
+        try:
+            while not self.stop_event.is_set():
+                for name in source.read(timeout=0.5):
+                    self._put(name)
+        finally:
+            source.close()
+
+    def _produce_polling(self):
+        seen = {}
+        while not self.stop_event.is_set():
+            current = {}
+            with os.scandir(self.folder) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        current[entry.name] = (st.st_size, st.st_mtime_ns)
+            for name, sig in current.items():
+                if seen.get(name) != sig:
+                    self._put(name)
+            seen = current
+            self.stop_event.wait(WATCH_POLL_INTERVAL)
+
+    def _start_producer(self):
+        source = None
+        if not self.poll:
+            try:
+                source = InotifySource(self.folder)
+            except (OSError, AttributeError):
+                source = None
+        if source is not None:
+            target, args, mode = self._produce_inotify, (source,), "inotify"
+            self._put(RESCAN)  # pick up files that landed before the watch started
+        else:
+            target, args, mode = self._produce_polling, (), "polling"
+        threading.Thread(target=target, args=args, daemon=True).start()
+        return mode
+
+    def _warm(self, dedup):
+        for name in list(self.index.categories) + ["Others"]:
+            category_dir = self.folder / name
+            if category_dir.is_dir():
+                for path, st in scan_folder(category_dir, recursive=True):
+                    dedup.add(path, st)
+
+    def _organize_file(self, path, st, dedup, engine, journal):
+        is_duplicate, digest = dedup.check(path, st)
+        category = "Duplicates" if is_duplicate else self.index.lookup(path)
+        target_folder = target_folder_for(self.folder, category, st, self.by_date)
+        target_folder.mkdir(parents=True, exist_ok=True)
+        move = Move(str(path), str(unique_dest(target_folder / path.name, set())), category)
+        journal.write([move])
+        engine.move(move.src, move.dest)
+        if not is_duplicate:
+            dedup.add(Path(move.dest), st, digest)
+        self.moved += 1
+        line = f"{move.src} -> {move.dest}"
+        if self.log_list is not None:
+            self.log_list.append(line)
+        else:
+            print(line)
+
+    def run(self):
+        cache = HashCache(self.folder) if self.use_cache else None
+        dedup = DedupIndex(cache)
+        self._warm(dedup)
+        engine = MoveEngine()
+        undo_path = self.folder / UNDO_FOLDER
+        undo_path.mkdir(exist_ok=True)
+        journal = MoveJournal(undo_path / f"undo_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl")
+        mode = self._start_producer()
+        print(f"Watching {self.folder} ({mode}); press Ctrl+C to stop.")
+
+        pending = {}  # name -> ((size, mtime_ns), time the signature last changed)
+        rescan = False
+        try:
+            while not self.stop_event.is_set():
+                names = []
+                try:
+                    if len(pending) < self.pending_size:
+                        names.append(self.events.get(timeout=0.5))
+                        while len(pending) + len(names) < self.pending_size:
+                            names.append(self.events.get_nowait())
+                    else:
+                        self.stop_event.wait(0.5)
+                except queue.Empty:
+                    pass
+                now = time.monotonic()
+                for name in names:
+                    if name is RESCAN:
+                        rescan = True
+                    elif name not in pending:
+                        pending[name] = (None, now)
+                if rescan and len(pending) < self.pending_size:
+                    # Fill up to the cap; files left over are found by the next rescan.
+                    rescan = False
+                    with os.scandir(self.folder) as it:
+                        for e in it:
+                            if len(pending) >= self.pending_size:
+                                rescan = True
+                                break
+                            if e.is_file() and self._wanted(e.name):
+                                pending.setdefault(e.name, (None, now))
+
+                for name, (sig, changed_at) in list(pending.items()):
+                    path = self.folder / name
+                    try:
+                        st = path.stat()
+                    except FileNotFoundError:
+                        del pending[name]
+                        continue
+                    if not path.is_file() or not self._wanted(name):
+                        del pending[name]
+                    elif (st.st_size, st.st_mtime_ns) != sig:
+                        pending[name] = ((st.st_size, st.st_mtime_ns), now)
+                    elif now - changed_at >= self.debounce:
+                        del pending[name]
+                        try:
+                            self._organize_file(path, st, dedup, engine, journal)
+                        except OSError as e:
+                            print(f"Could not organize {path}: {e}")
+                if cache is not None and cache.pending:
+                    cache.flush()
+        finally:
+            self.stop_event.set()
+            journal.close()
+            if self.moved == 0:
+                journal.path.unlink()
+            if cache is not None:
+                cache.close()
+
+    def stop(self):
+        self.stop_event.set()
+
+def watch_folders(folders, by_date=False, custom_rules=None, use_cache=True, debounce=WATCH_DEBOUNCE, poll=False):
+    custom_rules = compile_categories(custom_rules)
+    watchers = [FolderWatcher(f, by_date, custom_rules, use_cache, debounce=debounce, poll=poll) for f in folders]
+    threads = [threading.Thread(target=w.run, daemon=True) for w in watchers]
+    for t in threads:
+        t.start()
+    # Treat SIGTERM (service managers, kill) like Ctrl+C so journals and the cache are closed.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    try:
+        while any(t.is_alive() for t in threads):
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    for w in watchers:
+        w.stop()
+    for t in threads:
+        t.join()
+    print(f"Organized {sum(w.moved for w in watchers)} files while watching.")
+
 # ------------------ GUI: Category Editor ------------------
 def edit_categories_gui(parent):
     categories = load_custom_categories()
@@ -129,7 +1108,7 @@ def edit_categories_gui(parent):
     editor.geometry("400x400")
 
     tk.Label(editor, text="Category Name").grid(row=0, column=0, padx=5, pady=5)
-    tk.Label(editor, text="Extensions (comma-separated)").grid(row=0, column=1, padx=5, pady=5)
+    tk.Label(editor, text="Extensions / globs / MIME types (comma-separated)").grid(row=0, column=1, padx=5, pady=5)
 
     entries = {}
     for i, (cat, exts) in enumerate(categories.items(), start=1):
@@ -143,7 +1122,8 @@ def edit_categories_gui(parent):
         new_categories = {}
         for cat_var, exts_var in entries.values():
             name = cat_var.get().strip()
-            exts = [e.strip() if e.startswith('.') else '.'+e.strip() for e in exts_var.get().split(',') if e.strip()]
+            exts = [e.strip() for e in exts_var.get().split(',') if e.strip()]
+            exts = [e if e.startswith('.') or is_pattern(e) else '.' + e for e in exts]
             if name and exts:
                 new_categories[name] = exts
         save_custom_categories(new_categories)
@@ -153,6 +1133,18 @@ def edit_categories_gui(parent):
     tk.Button(editor, text="Save", command=save_categories).grid(row=i+1, column=0, columnspan=2, pady=10)
 
 # ------------------ GUI: Main ------------------
+class QueueLog:
+    # list-like log sink for organize/undo that forwards lines to the GUI's event queue.
+    def __init__(self, events):
+        self.events = events
+
+    def append(self, line):
+        self.events.put(("log", line))
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
 def run_gui():
     root = tk.Tk()
     root.title("File Organizer Pro")
@@ -167,6 +1159,15 @@ def run_gui():
 
     by_date_var = BooleanVar(value=False)
     safe_mode_var = BooleanVar(value=False)
+    recursive_var = BooleanVar(value=False)
+    sniff_var = BooleanVar(value=True)
+    workers_var = tk.IntVar(value=1)
+    status_var = tk.StringVar(value="Idle")
+
+    # Organize/undo run on a worker thread; it only talks to Tk through this queue, which
+    # poll_events() drains on the Tk thread every GUI_POLL_MS.
+    events = queue.Queue()
+    current = {"progress": None}
 
     def select_folder():
         folders = filedialog.askdirectory(mustexist=True)
@@ -175,34 +1176,131 @@ def run_gui():
             folder_paths.append(folders)
             folder_label.config(text=folders)
 
+    def set_running(running):
+        state = "disabled" if running else "normal"
+        for button in (organize_button, undo_button, select_button):
+            button.config(state=state)
+        cancel_button.config(state="normal" if running else "disabled")
+
+    def run_in_background(job, cancelled_message):
+        def worker():
+            try:
+                events.put(("done", job()))
+            except OrganizeCancelled:
+                events.put(("cancelled", cancelled_message))
+            except Exception as e:
+                events.put(("error", e))
+        set_running(True)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def show_progress(p):
+        mb = 1024 * 1024
+        text = (f"Scanned {p['files_scanned']} | hashed {p['bytes_hashed'] / mb:.1f}/"
+                f"{p['bytes_to_hash'] / mb:.1f} MB | moved {p['files_moved']}/{p['files_planned']}"
+                f" | {p['files_per_sec']:.0f} files/s")
+        if p["eta"] is not None:
+            text += f" | ETA {p['eta']:.0f}s"
+        status_var.set(text)
+
+    def poll_events():
+        lines = []
+        last_progress = None
+        try:
+            while True:
+                kind, payload = events.get_nowait()
+                if kind == "log":
+                    lines.append(payload)
+                elif kind == "progress":
+                    last_progress = payload
+                else:
+                    finish(kind, payload, lines)
+                    lines = []
+        except queue.Empty:
+            pass
+        if lines:
+            log_text.insert(END, "\n".join(lines) + "\n")
+            log_text.see(END)
+        if last_progress is not None:
+            show_progress(last_progress)
+        root.after(GUI_POLL_MS, poll_events)
+
+    def finish(kind, payload, lines):
+        if lines:
+            log_text.insert(END, "\n".join(lines) + "\n")
+        progress = current["progress"]
+        if progress is not None:
+            show_progress(progress.snapshot())
+        current["progress"] = None
+        set_running(False)
+        if kind == "done":
+            title, message = payload
+            messagebox.showinfo(title, message)
+        elif kind == "cancelled":
+            status_var.set("Cancelled")
+            messagebox.showinfo("Cancelled", payload)
+        else:
+            status_var.set("Failed")
+            messagebox.showerror("Error", str(payload))
+
     def start_organize():
         if not folder_paths:
             messagebox.showwarning("Warning", "Select folder first!")
             return
-        log_entries = []
-        custom_rules = load_custom_categories()
-        moved = batch_organize(folder_paths, by_date_var.get(), custom_rules, safe_mode_var.get(), log_list=log_entries)
-        for entry in log_entries:
-            log_text.insert(END, entry + "\n")
-        messagebox.showinfo("Done", f"Organized {len(moved)} files.")
+        progress = Progress(events)
+        current["progress"] = progress
+        folders = list(folder_paths)
+        options = (by_date_var.get(), safe_mode_var.get(), max(workers_var.get(), 1), recursive_var.get(), sniff_var.get())
+
+        def job():
+            by_date, safe_mode, workers, recursive, sniff = options
+            stats = new_stats()
+            custom_rules = compile_categories(load_custom_categories(), sniff)
+            moved = batch_organize(folders, by_date, custom_rules, safe_mode, log_list=QueueLog(events), stats=stats,
+                                   workers=workers, recursive=recursive, progress=progress)
+            events.put(("log", format_stats(stats)))
+            return "Done", f"Organized {len(moved)} files."
+
+        run_in_background(job, "Stopped. Use Undo Last to revert or --resume to finish.")
 
     def start_undo():
         if not folder_paths:
             messagebox.showwarning("Warning", "Select folder first!")
             return
-        for folder in folder_paths:
-            undo_last(folder)
-        messagebox.showinfo("Done", "Undo completed!")
+        progress = Progress(events)
+        current["progress"] = progress
+        folders = list(folder_paths)
+
+        def job():
+            count = sum(undo_last(folder, progress) or 0 for folder in folders)
+            return "Done", f"Undo completed! Reverted {count} files."
+
+        run_in_background(job, "Stopped. Use Undo Last again to finish reverting.")
 
-    tk.Button(root, text="Select Folder", command=select_folder).pack(pady=5)
+    def cancel():
+        if current["progress"] is not None:
+            current["progress"].cancel()
+            status_var.set("Cancelling...")
+
+    select_button = tk.Button(root, text="Select Folder", command=select_folder)
+    select_button.pack(pady=5)
     folder_label = tk.Label(root, text="No folder selected")
     folder_label.pack()
     Checkbutton(root, text="Organize by Date", variable=by_date_var).pack()
     Checkbutton(root, text="Safe/Preview Mode", variable=safe_mode_var).pack()
+    Checkbutton(root, text="Include Subfolders", variable=recursive_var).pack()
+    Checkbutton(root, text="Detect Type of Files Without Extension", variable=sniff_var).pack()
+    tk.Label(root, text="Workers").pack()
+    tk.Spinbox(root, from_=1, to=32, textvariable=workers_var, width=5).pack()
     tk.Button(root, text="Edit Categories", command=lambda: edit_categories_gui(root)).pack(pady=5)
-    tk.Button(root, text="Organize", command=start_organize).pack(pady=5)
-    tk.Button(root, text="Undo Last", command=start_undo).pack(pady=5)
+    organize_button = tk.Button(root, text="Organize", command=start_organize)
+    organize_button.pack(pady=5)
+    undo_button = tk.Button(root, text="Undo Last", command=start_undo)
+    undo_button.pack(pady=5)
+    cancel_button = tk.Button(root, text="Cancel", command=cancel, state="disabled")
+    cancel_button.pack(pady=5)
+    tk.Label(root, textvariable=status_var).pack()
 
+    root.after(GUI_POLL_MS, poll_events)
     root.mainloop()
 
 # ------------------ CLI ------------------
@@ -212,15 +1310,51 @@ if __name__ == "__main__":
     parser.add_argument("--by-date", action="store_true", help="Organize by modification date")
     parser.add_argument("--undo", action="store_true", help="Undo last operation")
     parser.add_argument("--safe", action="store_true", help="Preview mode, no files moved")
+    parser.add_argument("--resume", action="store_true", help="Finish an interrupted run")
+    parser.add_argument("--watch", action="store_true", help="Keep running and organize new files as they arrive")
+    parser.add_argument("--poll", action="store_true", help="Watch by polling instead of inotify")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE,
+                        help="Seconds a new file must stay unchanged before it is moved")
+    parser.add_argument("--recursive", action="store_true", help="Also organize files in subfolders")
+    parser.add_argument("--plan", metavar="FILE", help="Write the planned moves as JSON lines to FILE")
+    parser.add_argument("--workers", type=int, default=1, help="Threads used for hashing, moving and folders")
+    parser.add_argument("--no-sniff", action="store_true", help="Do not read magic bytes of unmatched files")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or update the hash cache")
+    parser.add_argument("--cache-stats", action="store_true", help="Show hash cache statistics")
+    parser.add_argument("--cache-evict", type=int, metavar="DAYS",
+                        help="Drop hash cache entries not seen for DAYS days")
     args = parser.parse_args()
 
     if args.folders:
-        if args.undo:
+        if args.cache_stats or args.cache_evict is not None:
+            for f in args.folders:
+                cache = HashCache(f)
+                if args.cache_evict is not None:
+                    print(f"{f}: evicted {cache.evict(args.cache_evict)} stale entries")
+                print(f"{f}: {cache.stats()}")
+                cache.close()
+        elif args.undo:
             for f in args.folders:
                 undo_last(f)
+        elif args.watch:
+            custom_rules = compile_categories(load_custom_categories(), sniff=not args.no_sniff)
+            watch_folders(args.folders, args.by_date, custom_rules, use_cache=not args.no_cache,
+                          debounce=args.debounce, poll=args.poll)
+        elif args.resume:
+            for f in args.folders:
+                resume_folder(f, workers=max(args.workers, 1))
         else:
-            custom_rules = load_custom_categories()
-            moved = batch_organize(args.folders, args.by_date, custom_rules, safe_mode=args.safe)
+            stats = new_stats()
+            custom_rules = compile_categories(load_custom_categories(), sniff=not args.no_sniff)
+            moved = batch_organize(args.folders, args.by_date, custom_rules, safe_mode=args.safe, stats=stats,
+                                   use_cache=not args.no_cache, workers=max(args.workers, 1),
+                                   recursive=args.recursive)
+            if args.plan:
+                save_plan(moved, args.plan)
+            elif args.safe:
+                for item in moved:
+                    print(f"{item['src']} -> {item['dest']}")
             print(f"Organized {len(moved)} files across {len(args.folders)} folder(s).")
+            print(format_stats(stats))
     else:
         run_gui()
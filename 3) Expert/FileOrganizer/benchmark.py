@@ -0,0 +1,173 @@
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from app import (DEFAULT_FILE_TYPES, scan_folder, find_duplicates, build_plan, run_journaled,
+                 undo_last, compile_categories, new_stats)
+
+# ------------------ Synthetic Trees ------------------
+# Every tree is generated from a seeded RNG, so the same scale produces byte-identical
+# input on every machine and results can be compared run to run.
+MB = 1024 * 1024
+EXTENSIONS = [ext for exts in DEFAULT_FILE_TYPES.values() for ext in exts] + [".bin", ".dat"]
+
+def write_file(path, rng, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as f:
+        block = rng.randbytes(min(size, MB))
+        written = 0
+        while written < size:
+            chunk = block[:size - written]
+            f.write(chunk)
+            written += len(chunk)
+            block = block[1:] + block[:1]  # vary blocks so files are not trivially repetitive
+
+def make_tiny(root, rng, scale):
+    for i in range(int(20000 * scale)):
+        write_file(root / f"tiny_{i}{rng.choice(EXTENSIONS)}", rng, rng.randint(0, 4096))
+
+def make_huge(root, rng, scale):
+    for i in range(max(int(4 * scale), 1)):
+        write_file(root / f"huge_{i}.mkv", rng, 64 * MB)
+
+def make_duplicates(root, rng, scale):
+    for i in range(int(2000 * scale)):
+        data = rng.randbytes(64 * 1024)
+        ext = rng.choice(EXTENSIONS)
+        for copy in range(5):
+            (root / f"dup_{i}_{copy}{ext}").write_bytes(data)
+
+def make_deep(root, rng, scale):
+    for i in range(int(5000 * scale)):
+        depth = rng.randint(1, 12)
+        folder = root.joinpath(*(f"d{rng.randint(0, 3)}" for _ in range(depth)))
+        write_file(folder / f"deep_{i}{rng.choice(EXTENSIONS)}", rng, rng.randint(0, 16 * 1024))
+
+def many_categories():
+    return {f"Category{i:03}": [f".c{i:03}{j}" for j in range(5)] for i in range(200)}
+
+def make_categories(root, rng, scale):
+    exts = [ext for exts in many_categories().values() for ext in exts]
+    for i in range(int(10000 * scale)):
+        write_file(root / f"cat_{i}{rng.choice(exts)}", rng, rng.randint(0, 2048))
+
+SCENARIOS = {
+    # name: (builder, recursive, custom categories)
+    "tiny": (make_tiny, False, None),
+    "huge": (make_huge, False, None),
+    "duplicates": (make_duplicates, False, None),
+    "deep": (make_deep, True, None),
+    "categories": (make_categories, False, many_categories),
+}
+
+# ------------------ Measurement ------------------
+def phase(seconds, files, nbytes):
+    return {
+        "seconds": round(seconds, 4),
+        "files_per_sec": round(files / seconds, 1) if seconds else None,
+        "mb_per_sec": round(nbytes / MB / seconds, 1) if seconds and nbytes else None,
+    }
+
+def peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # bytes on macOS, KiB on Linux
+
+def run_scenario(name, scale, seed, workers, base_dir):
+    builder, recursive, categories = SCENARIOS[name]
+    root = Path(tempfile.mkdtemp(prefix=f"fo_bench_{name}_", dir=base_dir))
+    try:
+        builder(root, random.Random(seed), scale)
+        rules = compile_categories(categories() if categories else None, sniff=False)
+        skip_dirs = set(rules.categories) | {"Duplicates", "Others"}
+
+        start = time.perf_counter()
+        files = list(scan_folder(root, recursive, skip_dirs))
+        scan_s = time.perf_counter() - start
+        total_bytes = sum(st.st_size for _, st in files)
+
+        stats = new_stats()
+        start = time.perf_counter()
+        find_duplicates(files, stats, cache=None, workers=workers)
+        hash_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        plan = tuple(build_plan(root, custom_rules=rules, use_cache=False, workers=workers, recursive=recursive))
+        plan_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_journaled(root, plan, workers)
+        move_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        undo_last(root)
+        undo_s = time.perf_counter() - start
+
+        return {
+            "scenario": name,
+            "files": len(files),
+            "bytes": total_bytes,
+            "duplicates": sum(1 for move in plan if move.category == "Duplicates"),
+            "phases": {
+                "scan": phase(scan_s, len(files), total_bytes),
+                "hash": dict(phase(hash_s, len(files), stats["bytes_read"]), bytes_read=stats["bytes_read"]),
+                "plan": phase(plan_s, len(plan), 0),
+                "move": phase(move_s, len(plan), total_bytes),
+                "undo": phase(undo_s, len(plan), total_bytes),
+            },
+            "peak_rss_kb": peak_rss_kb(),
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def run_isolated(name, scale, seed, workers, base_dir):
+    # Fresh process per scenario so peak RSS belongs to that scenario alone.
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(run_scenario, name, scale, seed, workers, base_dir).result()
+
+# ------------------ CLI ------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="File Organizer benchmark")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the number of files")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--dir", help="Where to build the trees (default: system temp dir)")
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON file to write")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.scenarios:
+        print(f"Running {name}...", flush=True)
+        result = run_isolated(name, args.scale, args.seed, max(args.workers, 1), args.dir)
+        results.append(result)
+        phases = ", ".join(f"{k} {v['seconds']:.2f}s" for k, v in result["phases"].items())
+        print(f"  {result['files']} files, {result['bytes'] / MB:.1f} MB: {phases}, "
+              f"peak RSS {result['peak_rss_kb']} KiB")
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "seed": args.seed,
+        "workers": args.workers,
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.out}")
@@ -1,15 +1,23 @@
 import logging
 import os
 import json
+import time
+import html
+import heapq
 import asyncio
+import sqlite3
 import aiohttp
+from collections import Counter, OrderedDict
+from contextlib import suppress
 from datetime import datetime
-from typing import Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, BotCommand
+from telegram.error import BadRequest, Forbidden, InvalidToken, NetworkError, RetryAfter, TelegramError
 from telegram.ext import (
     Application,
     CommandHandler,
     MessageHandler,
+    TypeHandler,
     CallbackQueryHandler,
     ConversationHandler,
     ContextTypes,
@@ -26,20 +34,634 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 ADMIN_IDS = []
-user_data_store: Dict[int, dict] = {}
+
+USER_DB_FILE = os.getenv("BOT_DB", "bot_users.db")
+STATS_FLUSH_SECONDS = 30
+STATS_FLUSH_MAX_PENDING = 1000  # flush early once this many counters are waiting
+# Per-user command counters only track these names (everything else is "other"), so each
+# user has a bounded number of counters however many commands they send.
+TRACKED_COMMANDS = {
+    "start", "help", "about", "stats", "weather", "crypto", "convert", "calc",
+    "remind", "schedule", "poll", "export", "broadcast", "broadcast_status", "userstats",
+}
+
+# Telegram allows bots about 30 messages/s overall and 1 message/s to the same chat.
+BROADCAST_RATE = 25
+BROADCAST_BURST = 25
+BROADCAST_CHAT_INTERVAL = 1.0
+BROADCAST_CHUNK = 100  # recipients sent concurrently between checkpoints
+BROADCAST_MAX_RETRIES = 3
+
+REMINDER_MAX_MINUTES = 60 * 24 * 365
+REMINDERS_PER_USER = 50
+REMINDER_RETRY_SECONDS = 60  # delay before retrying a reminder that could not be sent
+REMINDER_MAX_SLEEP = 60      # re-check the clock at least this often (clock changes, suspend)
+
+# One HTTP client for the whole application: connections (and their TLS sessions) are kept
+# alive and reused across commands, and DNS answers are cached, so a command usually costs
+# one request on a warm connection instead of a DNS lookup plus a TCP and TLS handshake.
+HTTP_SESSION_KEY = "http_session"
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "10"))
+HTTP_KEEPALIVE_SECONDS = 30
+HTTP_DNS_CACHE_SECONDS = 300
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=3, sock_read=7)
+
+# Seconds an API answer is fresh, then how much longer it may be served while a
+# background refresh runs. OpenWeatherMap updates roughly every 10 minutes; prices move faster.
+WEATHER_CACHE_TTL, WEATHER_CACHE_STALE = 600, 1800
+CRYPTO_CACHE_TTL, CRYPTO_CACHE_STALE = 60, 300
+API_CACHE_MAX_ENTRIES = 1024
 
 CHOOSING_CURRENCY, TYPING_AMOUNT = range(2)
 
+def create_http_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+        ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+    )
+    return aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+
+def http_session(context: ContextTypes.DEFAULT_TYPE) -> aiohttp.ClientSession:
+    return context.application.bot_data[HTTP_SESSION_KEY]
+
+class AsyncTTLCache:
+    # TTL cache for upstream API answers. Concurrent lookups of the same missing key share
+    # one fetch. An entry older than `ttl` is still served for another `stale_ttl` seconds
+    # while a single background refresh replaces it. Failed fetches are not cached.
+    def __init__(self, name: str, ttl: float, stale_ttl: float, max_entries: int = API_CACHE_MAX_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self.inflight: Dict[str, asyncio.Task] = {}
+        self.counters = {"hits": 0, "stale": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    async def get(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        entry = self.entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self.counters["hits"] += 1
+                self.entries.move_to_end(key)
+                return value
+            if age < self.ttl + self.stale_ttl:
+                self.counters["stale"] += 1
+                self._load(key, fetch, background=True)
+                return value
+
+        if key in self.inflight:
+            self.counters["coalesced"] += 1
+        else:
+            self.counters["misses"] += 1
+        # shield: one caller giving up must not cancel the fetch the others are waiting on
+        return await asyncio.shield(self._load(key, fetch))
+
+    def _load(self, key: str, fetch: Callable[[], Awaitable[Any]], background: bool = False) -> asyncio.Task:
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, fetch))
+            self.inflight[key] = task
+            if background:
+                # Nobody awaits a refresh; report its failure once, not once per stale hit.
+                task.add_done_callback(self._background_done)
+        return task
+
+    async def _fetch(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        finally:
+            self.inflight.pop(key, None)
+        self.entries[key] = (value, time.monotonic())
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return value
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"{self.name} cache refresh failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = sum(self.counters[k] for k in ("hits", "stale", "misses", "coalesced"))
+        served = lookups - self.counters["misses"]
+        return {**self.counters, "entries": len(self.entries), "hit_rate": served / lookups if lookups else 0.0}
+
+weather_cache = AsyncTTLCache("weather", WEATHER_CACHE_TTL, WEATHER_CACHE_STALE)
+crypto_cache = AsyncTTLCache("crypto", CRYPTO_CACHE_TTL, CRYPTO_CACHE_STALE)
+
+class UserStore:
+    # Users and their counters in SQLite. Handlers only bump in-memory deltas, which are
+    # written in one transaction every STATS_FLUSH_SECONDS (sooner if many are waiting) and
+    # on shutdown, so a busy chat costs no disk I/O per message. Deltas are dropped once
+    # written, so memory doesn't grow with the number of users or with uptime.
+    # SQLite calls run in a worker thread, one at a time, so the event loop never waits on disk.
+    def __init__(self, path: str):
+        self.path = path
+        self.conn: Optional[sqlite3.Connection] = None
+        self.lock = asyncio.Lock()
+        self.flusher: Optional[asyncio.Task] = None
+        self.flush_now = asyncio.Event()
+        self.new_users: Dict[int, str] = {}
+        self.messages: Counter = Counter()
+        self.commands: Counter = Counter()  # (user_id, command) -> count
+
+    async def start(self) -> None:
+        self.conn = await asyncio.to_thread(self._open)
+        self.flusher = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self.flusher is not None:
+            self.flusher.cancel()
+            with suppress(asyncio.CancelledError):
+                await self.flusher
+        await self.flush()
+        await self._run(self.conn.close)
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS users (
+                user_id INTEGER PRIMARY KEY,
+                join_date TEXT NOT NULL,
+                message_count INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS command_counts (
+                user_id INTEGER NOT NULL,
+                command TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (user_id, command)
+            );
+            CREATE TABLE IF NOT EXISTS reminders (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                chat_id INTEGER NOT NULL,
+                due_at REAL NOT NULL,
+                text TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS broadcasts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                text TEXT NOT NULL,
+                status TEXT NOT NULL,
+                cursor INTEGER NOT NULL DEFAULT 0,
+                total INTEGER NOT NULL,
+                sent INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                finished_at TEXT
+            );
+        """)
+        return conn
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        async with self.lock:
+            return await asyncio.to_thread(fn, *args)
+
+    def add_user(self, user_id: int) -> None:
+        self.new_users.setdefault(user_id, datetime.now().isoformat())
+        self._flush_if_full()
+
+    def record_message(self, user_id: int) -> None:
+        # Only counts for users who have used /start, as before.
+        self.messages[user_id] += 1
+        self._flush_if_full()
+
+    def record_command(self, user_id: int, command: str) -> None:
+        self.commands[(user_id, command if command in TRACKED_COMMANDS else "other")] += 1
+        self._flush_if_full()
+
+    def _flush_if_full(self) -> None:
+        if len(self.new_users) + len(self.messages) + len(self.commands) >= STATS_FLUSH_MAX_PENDING:
+            self.flush_now.set()
+
+    async def _flush_periodically(self) -> None:
+        # Every STATS_FLUSH_SECONDS, or as soon as _flush_if_full asks. After a failure it
+        # waits a full interval, so a broken database isn't retried on every message.
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.flush_now.wait(), STATS_FLUSH_SECONDS)
+            self.flush_now.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"User stats flush failed: {e}")
+                await asyncio.sleep(STATS_FLUSH_SECONDS)
+
+    async def flush(self) -> None:
+        new_users, messages, commands = self.new_users, self.messages, self.commands
+        if not (new_users or messages or commands):
+            return
+        self.new_users, self.messages, self.commands = {}, Counter(), Counter()
+        try:
+            await self._run(self._write, new_users, messages, commands)
+        except Exception:
+            # Put the deltas back so the next flush retries them.
+            for user_id, join_date in new_users.items():
+                self.new_users.setdefault(user_id, join_date)
+            self.messages.update(messages)
+            self.commands.update(commands)
+            raise
+
+    def _write(self, new_users: Dict[int, str], messages: Counter, commands: Counter) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO users (user_id, join_date) VALUES (?, ?)", new_users.items()
+            )
+            self.conn.executemany(
+                "UPDATE users SET message_count = message_count + ? WHERE user_id = ?",
+                [(count, user_id) for user_id, count in messages.items()]
+            )
+            self.conn.executemany(
+                "INSERT INTO command_counts (user_id, command, count) "
+                "SELECT ?, ?, ? WHERE EXISTS (SELECT 1 FROM users WHERE user_id = ?) "
+                "ON CONFLICT (user_id, command) DO UPDATE SET count = count + excluded.count",
+                [(user_id, command, count, user_id) for (user_id, command), count in commands.items()]
+            )
+
+    def _read_user(self, user_id: int) -> Optional[dict]:
+        row = self.conn.execute("SELECT * FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return None
+        commands = self.conn.execute(
+            "SELECT command, count FROM command_counts WHERE user_id = ? ORDER BY count DESC", (user_id,)
+        )
+        return {**dict(row), "commands_used": {r["command"]: r["count"] for r in commands}}
+
+    def _read_totals(self) -> Tuple[int, int]:
+        row = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(message_count), 0) FROM users").fetchone()
+        return row[0], row[1]
+
+    def _read_user_ids(self) -> List[int]:
+        return [row[0] for row in self.conn.execute("SELECT user_id FROM users")]
+
+    # Reads flush first, so they always include the latest counts.
+    async def get_user(self, user_id: int) -> Optional[dict]:
+        await self.flush()
+        return await self._run(self._read_user, user_id)
+
+    async def totals(self) -> Tuple[int, int]:
+        await self.flush()
+        return await self._run(self._read_totals)
+
+    async def user_ids(self) -> List[int]:
+        await self.flush()
+        return await self._run(self._read_user_ids)
+
+    # Broadcasts: `cursor` is the highest user_id handled so far, users are visited in
+    # user_id order, and the row is saved after every chunk so a restart can resume.
+    def _create_broadcast(self, text: str) -> dict:
+        with self.conn:
+            total = self.conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            cur = self.conn.execute(
+                "INSERT INTO broadcasts (text, status, total, created_at) VALUES (?, 'running', ?, ?)",
+                (text, total, datetime.now().isoformat())
+            )
+        return self._read_broadcast(cur.lastrowid)
+
+    def _read_broadcast(self, broadcast_id: Optional[int]) -> Optional[dict]:
+        if broadcast_id is None:
+            row = self.conn.execute("SELECT * FROM broadcasts ORDER BY id DESC LIMIT 1").fetchone()
+        else:
+            row = self.conn.execute("SELECT * FROM broadcasts WHERE id = ?", (broadcast_id,)).fetchone()
+        return dict(row) if row else None
+
+    def _save_broadcast(self, state: dict) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE broadcasts SET status = :status, cursor = :cursor, sent = :sent, failed = :failed, "
+                "finished_at = :finished_at WHERE id = :id", state
+            )
+
+    def _read_running_broadcasts(self) -> List[dict]:
+        return [dict(row) for row in self.conn.execute("SELECT * FROM broadcasts WHERE status = 'running'")]
+
+    def _read_user_ids_after(self, cursor: int, limit: int) -> List[int]:
+        rows = self.conn.execute(
+            "SELECT user_id FROM users WHERE user_id > ? ORDER BY user_id LIMIT ?", (cursor, limit)
+        )
+        return [row[0] for row in rows]
+
+    async def create_broadcast(self, text: str) -> dict:
+        await self.flush()
+        return await self._run(self._create_broadcast, text)
+
+    async def get_broadcast(self, broadcast_id: Optional[int] = None) -> Optional[dict]:
+        return await self._run(self._read_broadcast, broadcast_id)
+
+    async def save_broadcast(self, state: dict) -> None:
+        await self._run(self._save_broadcast, dict(state))
+
+    async def running_broadcasts(self) -> List[dict]:
+        return await self._run(self._read_running_broadcasts)
+
+    async def user_ids_after(self, cursor: int, limit: int) -> List[int]:
+        return await self._run(self._read_user_ids_after, cursor, limit)
+
+    # Reminders: due_at is a Unix timestamp so it means the same thing after a restart.
+    def _add_reminder(self, user_id: int, chat_id: int, due_at: float, text: str) -> dict:
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO reminders (user_id, chat_id, due_at, text, created_at) VALUES (?, ?, ?, ?, ?)",
+                (user_id, chat_id, due_at, text, datetime.now().isoformat())
+            )
+        return dict(self.conn.execute("SELECT * FROM reminders WHERE id = ?", (cur.lastrowid,)).fetchone())
+
+    def _update_reminder(self, reminder_id: int, due_at: Optional[float]) -> None:
+        with self.conn:
+            if due_at is None:
+                self.conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+            else:
+                self.conn.execute("UPDATE reminders SET due_at = ? WHERE id = ?", (due_at, reminder_id))
+
+    def _read_reminders(self) -> List[dict]:
+        return [dict(row) for row in self.conn.execute("SELECT * FROM reminders")]
+
+    async def add_reminder(self, user_id: int, chat_id: int, due_at: float, text: str) -> dict:
+        return await self._run(self._add_reminder, user_id, chat_id, due_at, text)
+
+    async def delete_reminder(self, reminder_id: int) -> None:
+        await self._run(self._update_reminder, reminder_id, None)
+
+    async def reschedule_reminder(self, reminder_id: int, due_at: float) -> None:
+        await self._run(self._update_reminder, reminder_id, due_at)
+
+    async def pending_reminders(self) -> List[dict]:
+        return await self._run(self._read_reminders)
+
+user_store = UserStore(USER_DB_FILE)
+
+class TokenBucket:
+    # `rate` acquisitions per second on average, bursts up to `capacity`. Waiters are served
+    # in order. pause() stops everyone, for Telegram's flood control (RetryAfter).
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+class ChatLimiter:
+    # Minimum spacing between messages to the same chat. Entries that have expired are
+    # pruned as the table grows, so it stays small however many chats get messages.
+    def __init__(self, interval: float, prune_at: int = 10000):
+        self.interval = interval
+        self.prune_at = prune_at
+        self.next_allowed: Dict[int, float] = {}
+
+    async def wait(self, chat_id: int) -> None:
+        now = time.monotonic()
+        at = max(now, self.next_allowed.get(chat_id, 0.0))
+        self.next_allowed[chat_id] = at + self.interval
+        if len(self.next_allowed) > self.prune_at:
+            self.next_allowed = {k: v for k, v in self.next_allowed.items() if v > now}
+        if at > now:
+            await asyncio.sleep(at - now)
+
+broadcast_bucket = TokenBucket(BROADCAST_RATE, BROADCAST_BURST)
+chat_limiter = ChatLimiter(BROADCAST_CHAT_INTERVAL)
+
+class BroadcastJob:
+    def __init__(self, state: dict):
+        self.state = state  # the broadcasts row, checkpointed after every chunk
+        self.errors: Counter = Counter()
+        self.started = time.monotonic()
+        self.done_at_start = state["sent"] + state["failed"]
+        self.task: Optional[asyncio.Task] = None
+        self.error: Optional[str] = None  # why the task stopped early, if it did
+
+    def throughput(self) -> float:
+        elapsed = time.monotonic() - self.started
+        done = self.state["sent"] + self.state["failed"] - self.done_at_start
+        return done / elapsed if elapsed > 0 else 0.0
+
+broadcast_jobs: Dict[int, BroadcastJob] = {}
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    delay = error.retry_after
+    return delay.total_seconds() if hasattr(delay, "total_seconds") else float(delay)
+
+async def send_broadcast_message(bot, chat_id: int, text: str, errors: Counter) -> bool:
+    for attempt in range(BROADCAST_MAX_RETRIES + 1):
+        await chat_limiter.wait(chat_id)
+        await broadcast_bucket.acquire()
+        try:
+            await bot.send_message(chat_id=chat_id, text=text, parse_mode="HTML")
+            return True
+        except RetryAfter as e:
+            broadcast_bucket.pause(retry_after_seconds(e))
+            errors["RetryAfter"] += 1
+        except (Forbidden, BadRequest) as e:
+            # Blocked the bot, deleted account, unknown chat: retrying won't help.
+            errors[type(e).__name__] += 1
+            return False
+        except NetworkError as e:
+            errors[type(e).__name__] += 1
+            await asyncio.sleep(2 ** attempt)
+        except InvalidToken:
+            raise
+        except TelegramError as e:
+            errors[type(e).__name__] += 1
+            return False
+    return False
+
+async def run_broadcast(application: Application, job: BroadcastJob) -> None:
+    state = job.state
+    try:
+        while True:
+            user_ids = await user_store.user_ids_after(state["cursor"], BROADCAST_CHUNK)
+            if not user_ids:
+                break
+            results = await asyncio.gather(*(
+                send_broadcast_message(application.bot, uid, state["text"], job.errors) for uid in user_ids
+            ), return_exceptions=True)
+            unexpected = [r for r in results if isinstance(r, BaseException)]
+            if unexpected:
+                raise unexpected[0]
+            state["sent"] += sum(results)
+            state["failed"] += len(results) - sum(results)
+            state["cursor"] = user_ids[-1]
+            await user_store.save_broadcast(state)
+        state["status"] = "done"
+    except asyncio.CancelledError:
+        # Shutting down: the row stays "running" and resumes from its last checkpoint.
+        raise
+    except InvalidToken as e:
+        # The bot can't send anything any more; resuming would fail the same way.
+        logger.error(f"Broadcast {state['id']} failed: {e}")
+        state["status"] = "failed"
+    except Exception as e:
+        # Anything else (bot shutting down, database trouble) may be temporary: leave the
+        # row "running" so the next start resumes it from the last checkpoint.
+        logger.error(f"Broadcast {state['id']} stopped, will resume after restart: {e}")
+        job.error = str(e)
+        return
+    state["finished_at"] = datetime.now().isoformat()
+    await user_store.save_broadcast(state)
+    logger.info(f"Broadcast {state['id']} {state['status']}: {state['sent']} sent, {state['failed']} failed")
+
+def start_broadcast(application: Application, state: dict) -> BroadcastJob:
+    job = BroadcastJob(state)
+    job.task = asyncio.create_task(run_broadcast(application, job))
+    broadcast_jobs[state["id"]] = job
+    return job
+
+class ReminderScheduler:
+    # Pending reminders are rows in the reminders table. The scheduler keeps a heap of
+    # (due_at, id) and a single task that sleeps until the earliest one is due, so thousands
+    # of reminders cost one timer instead of one sleeping handler each. Due reminders are
+    # released through the broadcast token bucket, so a backlog after downtime is sent at
+    # Telegram's rate instead of all at once. A row is deleted only once its message is sent
+    # or Telegram rejects the chat for good; anything else reschedules it, so reminders
+    # survive restarts (one being sent during a crash may arrive twice). Cancelled reminders
+    # leave the heap lazily, when they reach the top.
+    def __init__(self):
+        self.heap: List[Tuple[float, int]] = []
+        self.pending: Dict[int, dict] = {}
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.deliveries: set = set()
+        self.application: Optional[Application] = None
+
+    async def start(self, application: Application) -> None:
+        self.application = application
+        for reminder in await user_store.pending_reminders():
+            self._push(reminder)
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in [self.task, *self.deliveries]:
+            if task is not None and not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+
+    def _push(self, reminder: dict) -> None:
+        self.pending[reminder["id"]] = reminder
+        heapq.heappush(self.heap, (reminder["due_at"], reminder["id"]))
+        self.wakeup.set()
+
+    def for_user(self, user_id: int) -> List[dict]:
+        return sorted((r for r in self.pending.values() if r["user_id"] == user_id), key=lambda r: r["due_at"])
+
+    async def add(self, user_id: int, chat_id: int, delay_seconds: float, text: str) -> dict:
+        reminder = await user_store.add_reminder(user_id, chat_id, time.time() + delay_seconds, text)
+        self._push(reminder)
+        return reminder
+
+    async def cancel(self, user_id: int, reminder_id: int) -> bool:
+        reminder = self.pending.get(reminder_id)
+        if reminder is None or reminder["user_id"] != user_id:
+            return False
+        del self.pending[reminder_id]
+        await user_store.delete_reminder(reminder_id)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            self.wakeup.clear()
+            while self.heap and self.heap[0][1] not in self.pending:
+                heapq.heappop(self.heap)
+            if not self.heap:
+                await self.wakeup.wait()
+                continue
+            due_at, reminder_id = self.heap[0]
+            delay = due_at - time.time()
+            if delay > 0:
+                # Woken early by an add(); otherwise the earliest reminder is due.
+                with suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self.wakeup.wait(), min(delay, REMINDER_MAX_SLEEP))
+                continue
+            await broadcast_bucket.acquire()
+            if self.heap[0][1] != reminder_id or reminder_id not in self.pending:
+                continue  # an earlier reminder arrived, or this one was cancelled, meanwhile
+            heapq.heappop(self.heap)
+            task = asyncio.create_task(self._deliver(self.pending.pop(reminder_id)))
+            self.deliveries.add(task)
+            task.add_done_callback(self.deliveries.discard)
+
+    async def _deliver(self, reminder: dict) -> None:
+        try:
+            await chat_limiter.wait(reminder["chat_id"])
+            await self.application.bot.send_message(
+                chat_id=reminder["chat_id"],
+                text=f"🔔 <b>Reminder:</b>\n\n{html.escape(reminder['text'])}",
+                parse_mode="HTML"
+            )
+        except (Forbidden, BadRequest) as e:
+            logger.error(f"Dropping reminder {reminder['id']}: {e}")
+        except RetryAfter as e:
+            delay = retry_after_seconds(e)
+            broadcast_bucket.pause(delay)
+            await self._retry(reminder, delay, e)
+            return
+        except Exception as e:
+            await self._retry(reminder, REMINDER_RETRY_SECONDS, e)
+            return
+        await user_store.delete_reminder(reminder["id"])
+
+    async def _retry(self, reminder: dict, delay: float, error: Exception) -> None:
+        logger.warning(f"Reminder {reminder['id']} not sent, retrying in {delay:.0f}s: {error}")
+        reminder["due_at"] = time.time() + delay
+        self._push(reminder)
+        try:
+            await user_store.reschedule_reminder(reminder["id"], reminder["due_at"])
+        except Exception as e:
+            # The row keeps its old due time, so it is still sent after a restart.
+            logger.error(f"Could not save retry for reminder {reminder['id']}: {e}")
+
+reminders = ReminderScheduler()
+
+def cache_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+async def fetch_weather(session: aiohttp.ClientSession, city: str) -> Optional[dict]:
+    params = {"q": city, "appid": os.getenv("WEATHER_API_KEY", "demo"), "units": "metric"}
+    async with session.get("https://api.openweathermap.org/data/2.5/weather", params=params) as response:
+        if response.status == 404:
+            return None
+        response.raise_for_status()
+        return await response.json()
+
+async def fetch_crypto(session: aiohttp.ClientSession, coin: str) -> Optional[dict]:
+    params = {"ids": coin, "vs_currencies": "usd", "include_24hr_change": "true"}
+    async with session.get("https://api.coingecko.com/api/v3/simple/price", params=params) as response:
+        response.raise_for_status()
+        return (await response.json()).get(coin)
+
 async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user = update.effective_user
     user_id = user.id
     
-    if user_id not in user_data_store:
-        user_data_store[user_id] = {
-            "join_date": datetime.now().isoformat(),
-            "message_count": 0,
-            "commands_used": []
-        }
+    user_store.add_user(user_id)
     
     welcome_message = (
         f"👋 Welcome, {user.mention_html()}!\n\n"
@@ -70,11 +692,12 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 <b>Advanced Features:</b>
 /remind [minutes] [message] - Set a reminder
 /poll [question] | [option1] | [option2]... - Create a poll
-/schedule - View your scheduled tasks
+/schedule - View your reminders (/schedule cancel [id] to cancel one)
 /export - Export your data as JSON
 
 <b>Admin Commands:</b> (Admin only)
 /broadcast [message] - Send message to all users
+/broadcast_status [id] - Broadcast progress
 /userstats - Get bot usage statistics
 /ban [user_id] - Ban a user
 /unban [user_id] - Unban a user
@@ -111,12 +734,12 @@ License: MIT
 
 async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
+    user_data = await user_store.get_user(user_id)
     
-    if user_id not in user_data_store:
+    if user_data is None:
         await update.message.reply_text("No statistics available. Use the bot first!")
         return
     
-    user_data = user_data_store[user_id]
     join_date = datetime.fromisoformat(user_data["join_date"])
     days_active = (datetime.now() - join_date).days
     
@@ -127,7 +750,7 @@ async def stats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
 📅 Joined: {join_date.strftime('%Y-%m-%d %H:%M')}
 ⏱ Days Active: {days_active}
 💬 Messages Sent: {user_data['message_count']}
-🎯 Commands Used: {len(user_data['commands_used'])}
+🎯 Commands Used: {sum(user_data['commands_used'].values())}
 """
     await update.message.reply_html(stats_text)
 
@@ -140,15 +763,13 @@ async def weather_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     await update.message.reply_text(f"🌤 Fetching weather data for {city}...")
     
-    api_key = os.getenv("WEATHER_API_KEY", "demo")
-    url = f"https://api.openweathermap.org/data/2.5/weather?q={city}&appid={api_key}&units=metric"
+    key = cache_key(city)
+    session = http_session(context)
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    weather_text = f"""
+        data = await weather_cache.get(key, lambda: fetch_weather(session, key))
+        if data is not None:
+            weather_text = f"""
 🌍 <b>Weather in {data['name']}, {data['sys']['country']}</b>
 
 🌡 Temperature: {data['main']['temp']}°C
@@ -156,9 +777,9 @@ async def weather_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 🌬 Wind Speed: {data['wind']['speed']} m/s
 ☁️ Condition: {data['weather'][0]['description'].title()}
 """
-                    await update.message.reply_html(weather_text)
-                else:
-                    await update.message.reply_text("❌ City not found. Please check the spelling.")
+            await update.message.reply_html(weather_text)
+        else:
+            await update.message.reply_text("❌ City not found. Please check the spelling.")
     except Exception as e:
         logger.error(f"Weather API error: {e}")
         await update.message.reply_text("⚠️ Weather service temporarily unavailable.")
@@ -172,29 +793,24 @@ async def crypto_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     await update.message.reply_text(f"📈 Fetching {symbol} price...")
     
-    url = f"https://api.coingecko.com/api/v3/simple/price?ids={symbol.lower()}&vs_currencies=usd&include_24hr_change=true"
+    key = cache_key(symbol)
+    session = http_session(context)
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if symbol.lower() in data:
-                        price_data = data[symbol.lower()]
-                        change = price_data.get('usd_24h_change', 0)
-                        emoji = "📈" if change > 0 else "📉"
-                        
-                        crypto_text = f"""
+        price_data = await crypto_cache.get(key, lambda: fetch_crypto(session, key))
+        if price_data is not None:
+            change = price_data.get('usd_24h_change', 0)
+            emoji = "📈" if change > 0 else "📉"
+            
+            crypto_text = f"""
 💰 <b>{symbol} Price</b>
 
 💵 Price: ${price_data['usd']:,.2f}
 {emoji} 24h Change: {change:.2f}%
 """
-                        await update.message.reply_html(crypto_text)
-                    else:
-                        await update.message.reply_text(f"❌ Cryptocurrency {symbol} not found.")
-                else:
-                    await update.message.reply_text("❌ Failed to fetch crypto data.")
+            await update.message.reply_html(crypto_text)
+        else:
+            await update.message.reply_text(f"❌ Cryptocurrency {symbol} not found.")
     except Exception as e:
         logger.error(f"Crypto API error: {e}")
         await update.message.reply_text("⚠️ Crypto service temporarily unavailable.")
@@ -285,20 +901,52 @@ async def remind_command(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     try:
         minutes = int(context.args[0])
-        message = " ".join(context.args[1:])
-        
-        await update.message.reply_text(f"⏰ Reminder set for {minutes} minute(s)!")
-        
-        await asyncio.sleep(minutes * 60)
-        await context.bot.send_message(
-            chat_id=update.effective_chat.id,
-            text=f"🔔 <b>Reminder:</b>\n\n{message}",
-            parse_mode="HTML"
-        )
     except ValueError:
         await update.message.reply_text("❌ Invalid time format. Use a number for minutes.")
-    except Exception as e:
-        logger.error(f"Reminder error: {e}")
+        return
+    
+    if not 1 <= minutes <= REMINDER_MAX_MINUTES:
+        await update.message.reply_text(f"❌ Minutes must be between 1 and {REMINDER_MAX_MINUTES}.")
+        return
+    
+    user_id = update.effective_user.id
+    if len(reminders.for_user(user_id)) >= REMINDERS_PER_USER:
+        await update.message.reply_text(f"❌ You already have {REMINDERS_PER_USER} pending reminders.")
+        return
+    
+    message = " ".join(context.args[1:])
+    reminder = await reminders.add(user_id, update.effective_chat.id, minutes * 60, message)
+    await update.message.reply_text(
+        f"⏰ Reminder #{reminder['id']} set for {minutes} minute(s)!\n"
+        "Use /schedule to see or cancel your reminders."
+    )
+
+async def schedule_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
+    
+    if context.args and context.args[0].lower() == "cancel":
+        if len(context.args) < 2 or not context.args[1].lstrip("#").isdigit():
+            await update.message.reply_text("Usage: /schedule cancel [id]")
+            return
+        reminder_id = int(context.args[1].lstrip("#"))
+        if await reminders.cancel(user_id, reminder_id):
+            await update.message.reply_text(f"✅ Reminder #{reminder_id} cancelled.")
+        else:
+            await update.message.reply_text(f"❌ No pending reminder #{reminder_id}.")
+        return
+    
+    pending = reminders.for_user(user_id)
+    if not pending:
+        await update.message.reply_text("📭 No scheduled reminders.\nSet one with /remind [minutes] [message]")
+        return
+    
+    lines = [
+        f"#{r['id']} • {datetime.fromtimestamp(r['due_at']).strftime('%Y-%m-%d %H:%M')} • {html.escape(r['text'][:60])}"
+        for r in pending
+    ]
+    await update.message.reply_html(
+        "🗓 <b>Your Reminders:</b>\n\n" + "\n".join(lines) + "\n\nCancel one with /schedule cancel [id]"
+    )
 
 async def poll_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     if not context.args:
@@ -327,25 +975,19 @@ async def poll_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
 async def export_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
+    user_data = await user_store.get_user(user_id)
     
-    if user_id not in user_data_store:
+    if user_data is None:
         await update.message.reply_text("No data to export.")
         return
     
-    user_data = user_data_store[user_id]
     json_data = json.dumps(user_data, indent=2)
     
-    filename = f"user_data_{user_id}.json"
-    with open(filename, 'w') as f:
-        f.write(json_data)
-    
     await update.message.reply_document(
-        document=open(filename, 'rb'),
-        filename=filename,
+        document=json_data.encode(),
+        filename=f"user_data_{user_id}.json",
         caption="📦 Your data export"
     )
-    
-    os.remove(filename)
 
 async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
@@ -359,16 +1001,47 @@ async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         return
     
     message = " ".join(context.args)
-    success_count = 0
+    state = await user_store.create_broadcast(f"📢 <b>Broadcast:</b>\n\n{message}")
+    start_broadcast(context.application, state)
     
-    for uid in user_data_store.keys():
-        try:
-            await context.bot.send_message(chat_id=uid, text=f"📢 <b>Broadcast:</b>\n\n{message}", parse_mode="HTML")
-            success_count += 1
-        except Exception as e:
-            logger.error(f"Failed to send to {uid}: {e}")
+    await update.message.reply_text(
+        f"✅ Broadcast #{state['id']} started for {state['total']} users.\n"
+        f"Use /broadcast_status {state['id']} to follow it."
+    )
+
+async def broadcast_status_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user_id = update.effective_user.id
     
-    await update.message.reply_text(f"✅ Broadcast sent to {success_count} users.")
+    if user_id not in ADMIN_IDS:
+        await update.message.reply_text("❌ This command is admin-only.")
+        return
+    
+    broadcast_id = int(context.args[0]) if context.args and context.args[0].isdigit() else None
+    state = await user_store.get_broadcast(broadcast_id)
+    if state is None:
+        await update.message.reply_text("Broadcast not found." if broadcast_id else "No broadcasts yet.")
+        return
+    job = broadcast_jobs.get(state["id"])
+    if job is not None:
+        state = job.state  # live counts, ahead of the last checkpoint
+    
+    done = state["sent"] + state["failed"]
+    status_text = f"""
+📢 <b>Broadcast #{state['id']}</b> ({state['status']})
+
+✅ Sent: {state['sent']} / {state['total']}
+❌ Failed: {state['failed']}
+"""
+    if job is not None:
+        rate = job.throughput()
+        status_text += f"⚡ Throughput: {rate:.1f} msg/s\n"
+        if state["status"] == "running" and rate > 0:
+            status_text += f"⏳ ETA: {max(state['total'] - done, 0) / rate / 60:.1f} min\n"
+        if job.error:
+            status_text += f"⛔ Stopped: {html.escape(job.error)} (resumes after restart)\n"
+        if job.errors:
+            status_text += "⚠️ Errors: " + ", ".join(f"{name} {count}" for name, count in job.errors.most_common()) + "\n"
+    await update.message.reply_html(status_text)
 
 async def userstats_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
@@ -377,8 +1050,7 @@ async def userstats_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
         await update.message.reply_text("❌ This command is admin-only.")
         return
     
-    total_users = len(user_data_store)
-    total_messages = sum(data['message_count'] for data in user_data_store.values())
+    total_users, total_messages = await user_store.totals()
     
     stats = f"""
 📊 <b>Bot Statistics:</b>
@@ -386,15 +1058,23 @@ async def userstats_command(update: Update, context: ContextTypes.DEFAULT_TYPE)
 👥 Total Users: {total_users}
 💬 Total Messages: {total_messages}
 📈 Avg Messages/User: {total_messages/total_users if total_users > 0 else 0:.1f}
+
+🗄 <b>API Cache:</b>
 """
+    for cache in (weather_cache, crypto_cache):
+        c = cache.stats()
+        stats += (
+            f"• {cache.name}: {c['hit_rate']:.0%} served from cache, {c['entries']} entries\n"
+            f"  hits {c['hits']}, stale {c['stale']}, misses {c['misses']}, "
+            f"coalesced {c['coalesced']}, errors {c['errors']}\n"
+        )
     await update.message.reply_html(stats)
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     user_id = update.effective_user.id
     message_text = update.message.text
     
-    if user_id in user_data_store:
-        user_data_store[user_id]['message_count'] += 1
+    user_store.record_message(user_id)
     
     word_count = len(message_text.split())
     char_count = len(message_text)
@@ -410,6 +1090,13 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 """
     await update.message.reply_html(analysis)
 
+async def track_usage(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    user, message = update.effective_user, update.effective_message
+    if user is None or message is None or not message.text or not message.text.startswith("/"):
+        return
+    command = message.text.split()[0][1:].split("@")[0].lower()
+    user_store.record_command(user.id, command)
+
 async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     logger.error(f"Update {update} caused error {context.error}")
     
@@ -419,6 +1106,13 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         )
 
 async def post_init(application: Application) -> None:
+    application.bot_data[HTTP_SESSION_KEY] = create_http_session()
+    await user_store.start()
+    for state in await user_store.running_broadcasts():
+        logger.info(f"Resuming broadcast {state['id']} after user {state['cursor']}")
+        start_broadcast(application, state)
+    await reminders.start(application)
+    
     commands = [
         BotCommand("start", "Start the bot"),
         BotCommand("help", "Show help message"),
@@ -429,13 +1123,30 @@ async def post_init(application: Application) -> None:
         BotCommand("convert", "Currency converter"),
         BotCommand("calc", "Calculate expressions"),
         BotCommand("remind", "Set a reminder"),
+        BotCommand("schedule", "Your reminders"),
         BotCommand("poll", "Create a poll"),
         BotCommand("export", "Export your data"),
     ]
     await application.bot.set_my_commands(commands)
 
+async def post_stop(application: Application) -> None:
+    # Runs before Application.shutdown() closes the bot's HTTP client, so background
+    # sends are cancelled while they can still fail cleanly and resume on the next start.
+    for job in broadcast_jobs.values():
+        if job.task is not None and not job.task.done():
+            job.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await job.task
+    await reminders.stop()
+
 async def post_shutdown(application: Application) -> None:
     logger.info("Bot is shutting down gracefully...")
+    
+    session = application.bot_data.pop(HTTP_SESSION_KEY, None)
+    if session is not None:
+        await session.close()
+    
+    await user_store.stop()
 
 def main() -> None:
     token = os.getenv("TELEGRAM_BOT_TOKEN")
@@ -444,8 +1155,13 @@ def main() -> None:
         logger.error("TELEGRAM_BOT_TOKEN environment variable not set!")
         return
     
-    application = Application.builder().token(token).post_init(post_init).post_shutdown(post_shutdown).build()
+    application = (
+        Application.builder().token(token)
+        .post_init(post_init).post_stop(post_stop).post_shutdown(post_shutdown)
+        .build()
+    )
     
+    application.add_handler(TypeHandler(Update, track_usage), group=-1)
     application.add_handler(CommandHandler("start", start_command))
     application.add_handler(CommandHandler("help", help_command))
     application.add_handler(CommandHandler("about", about_command))
@@ -454,9 +1170,11 @@ def main() -> None:
     application.add_handler(CommandHandler("crypto", crypto_command))
     application.add_handler(CommandHandler("calc", calc_command))
     application.add_handler(CommandHandler("remind", remind_command))
+    application.add_handler(CommandHandler("schedule", schedule_command))
     application.add_handler(CommandHandler("poll", poll_command))
     application.add_handler(CommandHandler("export", export_command))
     application.add_handler(CommandHandler("broadcast", broadcast_command))
+    application.add_handler(CommandHandler("broadcast_status", broadcast_status_command))
     application.add_handler(CommandHandler("userstats", userstats_command))
     
     conv_handler = ConversationHandler(